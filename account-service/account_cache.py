@@ -0,0 +1,255 @@
+"""
+💾 Read-through cache for account records and owner account lists
+=================================================================
+Lookup order: in-process L1 -> Redis -> Postgres, always under the current
+version of the key (see account_versions.py):
+
+    account:<id>:<account_version>               -> account record (JSON)
+    owner_accounts:<owner_id>:<owner_version>    -> [account ids] (records come from the per-account cache)
+
+The version is read from Redis *before* Postgres is read. A write that lands
+in between bumps the version, so whatever this lookup stores sits under a key
+nobody reads again. L1 entries carry the version in their key too, so they
+go stale together with Redis.
+
+- single-flight: concurrent misses for the same keys in one process share one DB query
+- Redis down: fall back to Postgres (counted as result="error"), never fail the request
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import redis
+from prometheus_client import Counter, Histogram
+
+from account_versions import ACCOUNT_VERSION_KEY, OWNER_ACCOUNTS_VERSION_KEY
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+ACCOUNT_CACHE_TTL = int(os.environ.get('ACCOUNT_CACHE_TTL', 300))
+ACCOUNT_L1_SIZE = int(os.environ.get('ACCOUNT_L1_SIZE', 10000))
+ACCOUNT_L1_TTL = float(os.environ.get('ACCOUNT_L1_TTL', 30))
+
+# ==========================================
+# Metrics Definitions
+# ==========================================
+
+account_cache_lookups_total = Counter(
+    'account_cache_lookups_total',
+    'Account cache lookups by the layer that answered',
+    ['kind', 'result']   # kind: account | owner_list, result: l1 | redis | db | error
+)
+
+account_cache_lookup_duration_seconds = Histogram(
+    'account_cache_lookup_duration_seconds',
+    'Account cache lookup latency, including any DB fallback',
+    ['kind'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+class LocalCache:
+    """Thread-safe LRU with a TTL - the in-process L1"""
+
+    def __init__(self, max_size=ACCOUNT_L1_SIZE, ttl=ACCOUNT_L1_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class SingleFlight:
+    """Concurrent calls with the same key wait for the first one's result"""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def canonical_id(account_id):
+    """'0B6F3A4E-...' -> '0b6f3a4e-...'; raises ValueError for a non-UUID"""
+    return str(uuid.UUID(str(account_id)))
+
+
+class AccountCache:
+
+    def __init__(self, redis_client, load_accounts, load_owner_account_ids):
+        """
+        load_accounts(ids) -> [record dict with 'id']
+        load_owner_account_ids(owner_id) -> [account id]
+        """
+        self.redis = redis_client
+        self.load_accounts = load_accounts
+        self.load_owner_account_ids = load_owner_account_ids
+        self.l1 = LocalCache()
+        self._flight = SingleFlight()
+
+    def _versions(self, version_keys):
+        """Current versions; missing keys are seeded (SET NX) so every reader agrees on one"""
+        versions = self.redis.mget(version_keys)
+        missing = [key for key, version in zip(version_keys, versions) if version is None]
+        if missing:
+            seed = time.time_ns()
+            pipeline = self.redis.pipeline(transaction=False)
+            for key in missing:
+                pipeline.set(key, seed, nx=True)
+                pipeline.get(key)
+            seeded = dict(zip(missing, pipeline.execute()[1::2]))
+            versions = [seeded.get(key, version) for key, version in zip(version_keys, versions)]
+        return versions
+
+    def get_accounts(self, account_ids):
+        """{id: record} for the ids that exist - ids are canonicalized (lowercase UUID), like the keys returned"""
+        started = time.time()
+        # הצורה הקנונית - כמו ש-Postgres מחזיר וכמו ש-bump_account_versions מעלה גרסה
+        ids = list(dict.fromkeys(canonical_id(account_id) for account_id in account_ids))
+        try:
+            return self._get_accounts(ids)
+        except redis.RedisError as e:
+            logger.warning(f"Account cache unavailable, reading from DB: {e}")
+            account_cache_lookups_total.labels(kind='account', result='error').inc(len(ids))
+            return {record['id']: record for record in self.load_accounts(ids)}
+        finally:
+            account_cache_lookup_duration_seconds.labels(kind='account').observe(time.time() - started)
+
+    def _get_accounts(self, ids):
+        if not ids:
+            return {}
+
+        versions = self._versions([ACCOUNT_VERSION_KEY.format(account_id) for account_id in ids])
+        keys = {account_id: f"account:{account_id}:{version}" for account_id, version in zip(ids, versions)}
+
+        found = {}
+        for account_id in ids:
+            record = self.l1.get(keys[account_id])
+            if record is not None:
+                found[account_id] = record
+        account_cache_lookups_total.labels(kind='account', result='l1').inc(len(found))
+
+        missing = [account_id for account_id in ids if account_id not in found]
+        if missing:
+            hits = 0
+            for account_id, value in zip(missing, self.redis.mget([keys[a] for a in missing])):
+                if value is not None:
+                    record = json.loads(value)
+                    found[account_id] = record
+                    self.l1.put(keys[account_id], record)
+                    hits += 1
+            account_cache_lookups_total.labels(kind='account', result='redis').inc(hits)
+
+        missing = [account_id for account_id in ids if account_id not in found]
+        if missing:
+            flight_key = ('accounts',) + tuple(sorted(keys[a] for a in missing))
+            loaded = self._flight.do(flight_key, lambda: self._load_accounts(missing, keys))
+            found.update(loaded)
+            account_cache_lookups_total.labels(kind='account', result='db').inc(len(missing))
+
+        return found
+
+    def _load_accounts(self, account_ids, keys):
+        records = {record['id']: record for record in self.load_accounts(account_ids)}
+        if records:
+            pipeline = self.redis.pipeline(transaction=False)
+            for account_id, record in records.items():
+                pipeline.set(keys[account_id], json.dumps(record), ex=ACCOUNT_CACHE_TTL)
+                self.l1.put(keys[account_id], record)
+            pipeline.execute()
+        return records
+
+    def get_account(self, account_id):
+        return self.get_accounts([account_id]).get(canonical_id(account_id))
+
+    def get_owner_accounts(self, owner_id):
+        """[record] of one owner, in the order load_owner_account_ids returns them"""
+        started = time.time()
+        try:
+            account_ids = self._get_owner_account_ids(owner_id)
+        except redis.RedisError as e:
+            logger.warning(f"Account cache unavailable, reading from DB: {e}")
+            account_cache_lookups_total.labels(kind='owner_list', result='error').inc()
+            account_ids = [str(account_id) for account_id in self.load_owner_account_ids(owner_id)]
+        finally:
+            account_cache_lookup_duration_seconds.labels(kind='owner_list').observe(time.time() - started)
+
+        accounts = self.get_accounts(account_ids)
+        return [accounts[account_id] for account_id in account_ids if account_id in accounts]
+
+    def _get_owner_account_ids(self, owner_id):
+        version = self._versions([OWNER_ACCOUNTS_VERSION_KEY.format(owner_id)])[0]
+        key = f"owner_accounts:{owner_id}:{version}"
+
+        account_ids = self.l1.get(key)
+        if account_ids is not None:
+            account_cache_lookups_total.labels(kind='owner_list', result='l1').inc()
+            return account_ids
+
+        value = self.redis.get(key)
+        if value is not None:
+            account_ids = json.loads(value)
+            self.l1.put(key, account_ids)
+            account_cache_lookups_total.labels(kind='owner_list', result='redis').inc()
+            return account_ids
+
+        def load():
+            ids = [str(account_id) for account_id in self.load_owner_account_ids(owner_id)]
+            self.redis.set(key, json.dumps(ids), ex=ACCOUNT_CACHE_TTL)
+            self.l1.put(key, ids)
+            return ids
+
+        account_cache_lookups_total.labels(kind='owner_list', result='db').inc()
+        return self._flight.do(('owner', key), load)
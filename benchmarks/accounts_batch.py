@@ -0,0 +1,89 @@
+"""
+📊 Single-item vs batch account endpoints
+=========================================
+Creates --accounts accounts with POST /accounts and with POST /accounts/batch,
+then reads them back with GET /accounts/<id> and with POST /accounts/lookup,
+and prints requests/second and accounts/second for each:
+
+    python benchmarks/accounts_batch.py --token <jwt> --accounts 2000 --batch-size 500
+    python benchmarks/accounts_batch.py --user-id <uuid>     # signs a token with JWT_SECRET_KEY
+
+Every run adds accounts to the token's user. Run it against a throwaway database.
+"""
+
+import argparse
+import datetime
+import os
+import time
+
+import jwt
+import requests
+
+ACCOUNT_SERVICE_URL = os.environ.get('ACCOUNT_SERVICE_URL', 'http://localhost:5002')
+JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'dev-secret-key')
+
+
+def make_token(user_id):
+    return jwt.encode(
+        {'user_id': user_id, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+        JWT_SECRET_KEY, algorithm='HS256'
+    )
+
+
+def report(name, requests_made, accounts, elapsed):
+    print(f"  {name:<28} {requests_made:>6} requests  {elapsed:8.2f}s  {accounts / elapsed:10.1f} accounts/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=ACCOUNT_SERVICE_URL)
+    parser.add_argument('--token')
+    parser.add_argument('--user-id')
+    parser.add_argument('--accounts', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    if not args.token and not args.user_id:
+        parser.error('--token or --user-id is required')
+
+    session = requests.Session()
+    session.headers['Authorization'] = f"Bearer {args.token or make_token(args.user_id)}"
+    url = args.url.rstrip('/')
+
+    started = time.time()
+    single_ids = []
+    for _ in range(args.accounts):
+        response = session.post(f'{url}/accounts', json={'type': 'checking', 'balance_cents': 0})
+        response.raise_for_status()
+        single_ids.append(response.json()['id'])
+    report('POST /accounts', args.accounts, len(single_ids), time.time() - started)
+
+    started = time.time()
+    batch_ids = []
+    batches = 0
+    for start in range(0, args.accounts, args.batch_size):
+        count = min(args.batch_size, args.accounts - start)
+        response = session.post(f'{url}/accounts/batch', json={'accounts': [{'type': 'checking'}] * count})
+        response.raise_for_status()
+        batch_ids.extend(r['id'] for r in response.json()['results'] if r['status'] == 'created')
+        batches += 1
+    report(f'POST /accounts/batch x{args.batch_size}', batches, len(batch_ids), time.time() - started)
+
+    started = time.time()
+    for account_id in single_ids:
+        session.get(f'{url}/accounts/{account_id}').raise_for_status()
+    report('GET /accounts/<id>', len(single_ids), len(single_ids), time.time() - started)
+
+    started = time.time()
+    found = 0
+    lookups = 0
+    for start in range(0, len(batch_ids), args.batch_size):
+        response = session.post(f'{url}/accounts/lookup', json={'ids': batch_ids[start:start + args.batch_size]})
+        response.raise_for_status()
+        found += len(response.json()['accounts'])
+        lookups += 1
+    report(f'POST /accounts/lookup x{args.batch_size}', lookups, found, time.time() - started)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+📊 CreateUser (unary) vs CreateUsers (batch) throughput
+=======================================================
+Creates --users new users both ways against a running user-service and
+prints users/second for each:
+
+    python benchmarks/create_users.py --users 2000 --batch-size 500
+    python benchmarks/create_users.py --concurrency 8        # unary from 8 threads
+
+Every run uses fresh emails (bench-<run>-<n>@example.com). Run it against a
+throwaway database. Needs the generated stubs in user-service/ (see its Dockerfile).
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'user-service'))
+import user_service_pb2  # noqa: E402
+import user_service_pb2_grpc  # noqa: E402
+
+USER_SERVICE_URL = os.environ.get('USER_SERVICE_URL', 'localhost:5001')
+
+
+def make_users(prefix, count):
+    return [
+        user_service_pb2.CreateUserRequest(
+            first_name='Bench', last_name=str(n),
+            email=f'bench-{prefix}-{n}@example.com', password=f'password-{n}'
+        )
+        for n in range(count)
+    ]
+
+
+def run_unary(stub, users, concurrency):
+    def create(user):
+        try:
+            stub.CreateUser(user)
+            return True
+        except grpc.RpcError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return sum(pool.map(create, users))
+
+
+def run_batch(stub, users, batch_size):
+    created = 0
+    for start in range(0, len(users), batch_size):
+        response = stub.CreateUsers(
+            user_service_pb2.CreateUsersRequest(users=users[start:start + batch_size])
+        )
+        created += response.created
+    return created
+
+
+def report(name, created, total, elapsed):
+    print(f"  {name:<28} {created:>6}/{total} created  {elapsed:8.2f}s  {created / elapsed:10.1f} users/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', default=USER_SERVICE_URL)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=1, help='threads for the unary run')
+    args = parser.parse_args()
+
+    stub = user_service_pb2_grpc.UserServiceStub(grpc.insecure_channel(args.target))
+    run = uuid.uuid4().hex[:8]
+
+    users = make_users(f'{run}-unary', args.users)
+    started = time.time()
+    created = run_unary(stub, users, args.concurrency)
+    report(f'CreateUser x{args.concurrency} threads', created, len(users), time.time() - started)
+
+    users = make_users(f'{run}-batch', args.users)
+    started = time.time()
+    created = run_batch(stub, users, args.batch_size)
+    report(f'CreateUsers batch={args.batch_size}', created, len(users), time.time() - started)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+-- 0001: אינדקסים לפי ה-queries החמים של השירותים
+-- CONCURRENTLY - בטוח להריץ על DB חי (לא נועל כתיבות). לכן בלי BEGIN/COMMIT.
+
+-- account-service list_accounts + כל בדיקות הבעלות (id = :id AND owner_id = :owner_id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "accounts_owner_id_index"
+    ON "accounts"("owner_id");
+
+-- transaction-service history: כל צד של ה-UNION ALL נקרא לפי סדר האינדקס ונעצר ב-LIMIT
+-- (keyset על created_at, id - אותו כיוון כמו ה-ORDER BY)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "transactions_from_account_created_index"
+    ON "transactions"("from_bank_account_id", "created_at" DESC, "id" DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "transactions_to_account_created_index"
+    ON "transactions"("to_bank_account_id", "created_at" DESC, "id" DESC);
+
+-- תור אישורים: WHERE state = 'pending' ORDER BY created_at
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "transfer_requests_state_created_index"
+    ON "transfer_requests"("state", "created_at");
+
+-- מיותרים: state הוא prefix של האינדקס החדש, ו-users_email_unique כבר מאנדקס את email
+DROP INDEX CONCURRENTLY IF EXISTS "transfer_requests_state_index";
+DROP INDEX CONCURRENTLY IF EXISTS "users_email_index";
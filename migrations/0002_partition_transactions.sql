@@ -0,0 +1,76 @@
+-- 0002: range partitioning חודשי ל-transactions לפי created_at
+--  * queries עם טווח תאריכים סורקים רק את החודשים הרלוונטיים
+--  * אינדקסים קטנים לכל חודש, ו-archive/drop של חודש ישן הוא DETACH מהיר
+--
+-- ה-PK הופך ל-(id, created_at) (חובה ב-partitioned table), ולכן ה-FK
+-- transfer_requests.transaction_id -> transactions(id) יורד.
+-- רצים בטרנזקציה אחת: התוכן מועתק לטבלה החדשה והטבלה הישנה נמחקת.
+
+BEGIN;
+
+ALTER TABLE "transfer_requests" DROP CONSTRAINT IF EXISTS "transfer_requests_transaction_id_foreign";
+
+ALTER TABLE "transactions" RENAME TO "transactions_unpartitioned";
+ALTER TABLE "transactions_unpartitioned" DROP CONSTRAINT IF EXISTS "transactions_pkey";
+DROP INDEX IF EXISTS "transactions_from_account_created_index";
+DROP INDEX IF EXISTS "transactions_to_account_created_index";
+
+CREATE TABLE "transactions" (
+    "id" UUID NOT NULL,
+    "initiator_id" UUID NOT NULL,
+    "from_bank_account_id" UUID,
+    "to_bank_account_id" UUID,
+    "amount" BIGINT NOT NULL,
+    "created_at" TIMESTAMP(0) WITHOUT TIME ZONE NOT NULL,
+    "updated_at" TIMESTAMP(0) WITHOUT TIME ZONE NOT NULL
+) PARTITION BY RANGE ("created_at");
+
+ALTER TABLE "transactions" ADD PRIMARY KEY ("id", "created_at");
+ALTER TABLE "transactions" ADD CONSTRAINT "transactions_from_bank_account_id_foreign" FOREIGN KEY("from_bank_account_id") REFERENCES "accounts"("id");
+ALTER TABLE "transactions" ADD CONSTRAINT "transactions_to_bank_account_id_foreign" FOREIGN KEY("to_bank_account_id") REFERENCES "accounts"("id");
+
+-- מוגדרים על ה-parent ונוצרים אוטומטית בכל partition
+CREATE INDEX "transactions_from_account_created_index"
+    ON "transactions"("from_bank_account_id", "created_at" DESC, "id" DESC);
+CREATE INDEX "transactions_to_account_created_index"
+    ON "transactions"("to_bank_account_id", "created_at" DESC, "id" DESC);
+
+-- יצירת partition לחודש (אידמפוטנטי). להריץ מראש לחודש הבא, למשל מ-cron:
+--   SELECT create_transactions_partition((date_trunc('month', now()) + interval '1 month')::date);
+CREATE OR REPLACE FUNCTION create_transactions_partition(p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::date;
+    v_name TEXT := 'transactions_' || to_char(v_start, 'YYYY_MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF "transactions" FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, (v_start + interval '1 month')::date
+    );
+    RETURN v_name;
+END;
+$$;
+
+-- כל חודש שיש בו נתונים + 12 חודשים קדימה
+DO $$
+BEGIN
+    PERFORM create_transactions_partition(month::date)
+    FROM (
+        SELECT DISTINCT date_trunc('month', "created_at") AS month FROM "transactions_unpartitioned"
+        UNION
+        SELECT generate_series(date_trunc('month', now()), date_trunc('month', now()) + interval '12 months', interval '1 month')
+    ) AS months;
+END;
+$$;
+
+-- רשת ביטחון לשורות מחוץ לטווח. שים לב: אם יש בה שורות של חודש מסוים,
+-- צריך להעביר אותן לפני שיוצרים את ה-partition של אותו חודש.
+CREATE TABLE IF NOT EXISTS "transactions_default" PARTITION OF "transactions" DEFAULT;
+
+INSERT INTO "transactions" SELECT * FROM "transactions_unpartitioned";
+DROP TABLE "transactions_unpartitioned";
+
+ANALYZE "transactions";
+
+COMMIT;
@@ -0,0 +1,4 @@
+-- 0003: user-service ListUsers - keyset pagination על (created_at, id)
+-- ORDER BY created_at, id LIMIT n נקרא לפי סדר האינדקס, בלי sort ובלי לסרוק את ה-OFFSET
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "users_created_at_id_index"
+    ON "users"("created_at", "id");
@@ -0,0 +1,7 @@
+-- 0004: user-service RevokeToken - טוקנים שבוטלו (logout), לפי ה-jti שלהם
+-- expires_at = ה-exp של הטוקן (unix seconds); אחרי זה השורה מיותרת ואפשר למחוק אותה
+CREATE TABLE IF NOT EXISTS "revoked_tokens"(
+    "jti" UUID PRIMARY KEY,
+    "expires_at" BIGINT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS "revoked_tokens_expires_at_index" ON "revoked_tokens"("expires_at");
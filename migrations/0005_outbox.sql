@@ -0,0 +1,9 @@
+-- 0005: transactional outbox (transaction-service)
+-- אירועים נכתבים כאן באותה טרנזקציה של transfer_requests, וה-relay (outbox.py) שולח אותם ל-Kafka
+CREATE TABLE IF NOT EXISTS "outbox" (
+    "id" BIGSERIAL PRIMARY KEY,
+    "topic" TEXT NOT NULL,
+    "message_key" TEXT,
+    "payload" JSONB NOT NULL,
+    "created_at" TIMESTAMP(0) WITHOUT TIME ZONE NOT NULL
+);
@@ -0,0 +1,62 @@
+-- 0006: execute_transfer - ביצוע העברה אטומי ב-round trip אחד
+-- נקרא מ-transfer-processor. מחזיר status: completed / insufficient_funds / skipped
+--  * claim מותנה (state = 'approved') - אידמפוטנטי מול הודעות כפולות ו-replicas
+--  * נעילת שני החשבונות לפי סדר id - בלי deadlocks בין העברות הפוכות
+--  * הניכוי מותנה ב-balance_cents >= amount - אין overdraft גם תחת מקביליות
+CREATE OR REPLACE FUNCTION execute_transfer(p_transfer_id UUID, p_transaction_id UUID, p_now TIMESTAMP)
+RETURNS TABLE (status TEXT, initiator_email TEXT, from_account_number TEXT, to_account_number TEXT)
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_transfer transfer_requests%ROWTYPE;
+    v_from_number TEXT;
+    v_to_number TEXT;
+BEGIN
+    UPDATE transfer_requests
+    SET state = 'completed', updated_at = p_now
+    WHERE id = p_transfer_id AND state = 'approved'
+    RETURNING * INTO v_transfer;
+
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'skipped'::TEXT, NULL::TEXT, NULL::TEXT, NULL::TEXT;
+        RETURN;
+    END IF;
+
+    PERFORM 1 FROM accounts
+    WHERE id IN (v_transfer.from_account_id, v_transfer.to_account_id)
+    ORDER BY id
+    FOR UPDATE;
+
+    UPDATE accounts
+    SET balance_cents = balance_cents - v_transfer.amount, updated_at = p_now
+    WHERE id = v_transfer.from_account_id AND balance_cents >= v_transfer.amount
+    RETURNING account_number INTO v_from_number;
+
+    IF NOT FOUND THEN
+        UPDATE transfer_requests
+        SET state = 'failed', decline_reason = 'Insufficient funds', updated_at = p_now
+        WHERE id = p_transfer_id;
+
+        RETURN QUERY SELECT 'insufficient_funds'::TEXT, NULL::TEXT, NULL::TEXT, NULL::TEXT;
+        RETURN;
+    END IF;
+
+    UPDATE accounts
+    SET balance_cents = balance_cents + v_transfer.amount, updated_at = p_now
+    WHERE id = v_transfer.to_account_id
+    RETURNING account_number INTO v_to_number;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Destination account % not found', v_transfer.to_account_id;
+    END IF;
+
+    INSERT INTO transactions
+    (id, initiator_id, from_bank_account_id, to_bank_account_id, amount, created_at, updated_at)
+    VALUES (p_transaction_id, v_transfer.initiator_id, v_transfer.from_account_id, v_transfer.to_account_id, v_transfer.amount, p_now, p_now);
+
+    UPDATE transfer_requests SET transaction_id = p_transaction_id WHERE id = p_transfer_id;
+
+    RETURN QUERY
+    SELECT 'completed'::TEXT, users.email, v_from_number, v_to_number
+    FROM users WHERE users.id = v_transfer.initiator_id;
+END;
+$$;
@@ -1,9 +1,11 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
-from datetime import datetime
 import logging
 from metrics_middleware import setup_metrics
+from providers import get_provider
+from dispatcher import NotificationDispatcher, QueueFull
+from digest import NotificationDigest
 
 
 app = Flask(__name__)
@@ -17,6 +19,28 @@ logger = logging.getLogger(__name__)
 # Configuration
 EMAIL_ENABLED = os.environ.get('EMAIL_ENABLED', 'false').lower() == 'true'
 SMS_ENABLED = os.environ.get('SMS_ENABLED', 'false').lower() == 'true'
+NOTIFICATION_BATCH_MAX = int(os.environ.get('NOTIFICATION_BATCH_MAX', 500))
+
+# מסירה אסינכרונית - תור ו-workers לכל ערוץ (ראה dispatcher.py)
+dispatcher = NotificationDispatcher({
+    'email': get_provider('email', EMAIL_ENABLED),
+    'sms': get_provider('sms', SMS_ENABLED)
+})
+
+# אישורי העברה לאותו משתמש בתוך חלון זמן -> הודעה אחת (ראה digest.py)
+digest = NotificationDigest(dispatcher)
+
+def queue_notification(message, result, coalesce=False):
+    """Enqueue for delivery (or for the digest) - 202, or 503 when the channel queue is full"""
+    try:
+        if coalesce:
+            notification_id = digest.add([message])[0]
+        else:
+            notification_id = dispatcher.enqueue(message)
+    except QueueFull as e:
+        logger.warning(f"⚠️ {e}")
+        return {"error": "Notification queue is full, retry later"}, 503
+    return {**result, "id": notification_id}, 202
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -25,76 +49,66 @@ def health():
 @app.route('/notifications/email', methods=['POST'])
 def send_email():
     """Send email notification"""
-    data = request.get_json()
-    
+    result, status_code = process_email(request.get_json())
+    return jsonify(result), status_code
+
+def process_email(data):
     to_email = data.get('to')
     subject = data.get('subject')
     body = data.get('body')
     
     if not all([to_email, subject, body]):
-        return jsonify({"error": "Missing required fields"}), 400
-    
-    # For now, just log the email
-    logger.info(f"""
-    ===== EMAIL NOTIFICATION =====
-    To: {to_email}
-    Subject: {subject}
-    Body: {body}
-    Timestamp: {datetime.now().isoformat()}
-    ==============================
-    """)
-    
-    if EMAIL_ENABLED:
-        # TODO: Integrate with actual email service (SendGrid, SES, etc.)
-        pass
+        return {"error": "Missing required fields"}, 400
     
-    return jsonify({
-        "message": "Email notification sent (logged)",
-        "to": to_email,
-        "subject": subject
-    }), 200
+    if not isinstance(to_email, str):
+        return {"error": "to must be a string"}, 400
+    
+    return queue_notification(
+        {"channel": "email", "to": to_email, "subject": subject, "body": body},
+        {"message": "Email notification queued", "to": to_email, "subject": subject}
+    )
 
 @app.route('/notifications/sms', methods=['POST'])
 def send_sms():
     """Send SMS notification"""
-    data = request.get_json()
-    
+    result, status_code = process_sms(request.get_json())
+    return jsonify(result), status_code
+
+def process_sms(data):
     to_phone = data.get('to')
     message = data.get('message')
     
     if not all([to_phone, message]):
-        return jsonify({"error": "Missing required fields"}), 400
-    
-    # For now, just log the SMS
-    logger.info(f"""
-    ===== SMS NOTIFICATION =====
-    To: {to_phone}
-    Message: {message}
-    Timestamp: {datetime.now().isoformat()}
-    ============================
-    """)
+        return {"error": "Missing required fields"}, 400
     
-    if SMS_ENABLED:
-        # TODO: Integrate with actual SMS service (Twilio, SNS, etc.)
-        pass
+    if not isinstance(to_phone, str):
+        return {"error": "to must be a string"}, 400
     
-    return jsonify({
-        "message": "SMS notification sent (logged)",
-        "to": to_phone
-    }), 200
+    return queue_notification(
+        {"channel": "sms", "to": to_phone, "body": message},
+        {"message": "SMS notification queued", "to": to_phone}
+    )
 
 @app.route('/notifications/transaction', methods=['POST'])
 def notify_transaction():
     """Send notification about a transaction"""
-    data = request.get_json()
-    
+    result, status_code = process_transaction(request.get_json())
+    return jsonify(result), status_code
+
+def process_transaction(data):
     transaction_type = data.get('type')  # deposit, withdrawal, transfer
     amount = data.get('amount')
     user_email = data.get('user_email')
     account_number = data.get('account_number')
     
     if not all([transaction_type, amount, user_email]):
-        return jsonify({"error": "Missing required fields"}), 400
+        return {"error": "Missing required fields"}, 400
+    
+    if not isinstance(amount, int) or isinstance(amount, bool):
+        return {"error": "amount must be an integer (cents)"}, 400
+    
+    if not isinstance(user_email, str):
+        return {"error": "user_email must be a string"}, 400
     
     # Create notification message
     if transaction_type == 'deposit':
@@ -108,39 +122,29 @@ def notify_transaction():
         to_account = data.get('to_account_number', 'XXXX')
         body = f"A transfer of ${amount/100:.2f} was made from account {account_number} to account {to_account}."
     else:
-        return jsonify({"error": "Invalid transaction type"}), 400
-    
-    # Log the notification
-    logger.info(f"""
-    ===== TRANSACTION NOTIFICATION =====
-    Type: {transaction_type}
-    Amount: ${amount/100:.2f}
-    To: {user_email}
-    Account: {account_number}
-    Timestamp: {datetime.now().isoformat()}
-    ====================================
-    """)
-    
-    if EMAIL_ENABLED:
-        # TODO: Send actual email
-        pass
+        return {"error": "Invalid transaction type"}, 400
     
-    return jsonify({
-        "message": "Transaction notification sent",
-        "type": transaction_type,
-        "to": user_email
-    }), 200
+    return queue_notification(
+        {"channel": "email", "to": user_email, "subject": subject, "body": body, "summary": body},
+        {"message": "Transaction notification queued", "type": transaction_type, "to": user_email},
+        coalesce=transaction_type == 'transfer'
+    )
 
 @app.route('/notifications/welcome', methods=['POST'])
 def send_welcome():
     """Send welcome email to new user"""
-    data = request.get_json()
-    
+    result, status_code = process_welcome(request.get_json())
+    return jsonify(result), status_code
+
+def process_welcome(data):
     user_email = data.get('email')
     first_name = data.get('first_name')
     
     if not all([user_email, first_name]):
-        return jsonify({"error": "Missing required fields"}), 400
+        return {"error": "Missing required fields"}, 400
+    
+    if not isinstance(user_email, str):
+        return {"error": "email must be a string"}, 400
     
     subject = "Welcome to Our Banking Service!"
     body = f"""
@@ -159,22 +163,58 @@ def send_welcome():
     The Banking Team
     """
     
-    logger.info(f"""
-    ===== WELCOME EMAIL =====
-    To: {user_email}
-    Name: {first_name}
-    Timestamp: {datetime.now().isoformat()}
-    =========================
-    """)
+    return queue_notification(
+        {"channel": "email", "to": user_email, "subject": subject, "body": body},
+        {"message": "Welcome email queued", "to": user_email}
+    )
+
+# kind -> handler, עבור ה-batch endpoint וה-Kafka consumer
+NOTIFICATION_HANDLERS = {
+    'email': process_email,
+    'sms': process_sms,
+    'transaction': process_transaction,
+    'welcome': process_welcome
+}
+
+def handle_notification(item):
+    """One notification of any kind ({"kind": ..., ...fields}) -> (result, status_code)"""
+    if not isinstance(item, dict):
+        return {"error": "Notification must be an object"}, 400
+    handler = NOTIFICATION_HANDLERS.get(item.get('kind', 'transaction'))
+    if not handler:
+        return {"error": f"Unknown kind '{item.get('kind')}'"}, 400
+    return handler(item)
+
+@app.route('/notifications/batch', methods=['POST'])
+def send_batch():
+    """
+    Queue many notifications in one call.
+    Body: {"notifications": [{"kind": "transaction", ...fields}, ...]}
+    Returns one result per item, in order - a bad item (or a full queue) does not fail the batch.
+    """
+    data = request.get_json()
+    notifications = data.get('notifications') if isinstance(data, dict) else None
+    
+    if not isinstance(notifications, list):
+        return jsonify({"error": "'notifications' must be a list"}), 400
+    
+    if len(notifications) > NOTIFICATION_BATCH_MAX:
+        return jsonify({"error": f"Batch too large (max {NOTIFICATION_BATCH_MAX})"}), 413
     
-    if EMAIL_ENABLED:
-        # TODO: Send actual email
-        pass
+    results = []
+    for item in notifications:
+        result, status_code = handle_notification(item)
+        if status_code >= 400:
+            results.append({"status": "error", "error": result.get('error')})
+        else:
+            results.append({"status": "queued", "id": result['id']})
     
+    queued = sum(1 for r in results if r['status'] == 'queued')
     return jsonify({
-        "message": "Welcome email sent",
-        "to": user_email
-    }), 200
+        "message": f"{queued}/{len(results)} notifications queued",
+        "results": results
+    }), 202
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5004)
\ No newline at end of file
+    # dev server בלבד - ב-production: gunicorn -c gunicorn.conf.py app:app
+    app.run(debug=os.environ.get('FLASK_DEBUG', 'false').lower() == 'true', host='0.0.0.0', port=5004)
\ No newline at end of file
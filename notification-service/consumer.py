@@ -0,0 +1,115 @@
+"""
+📥 Kafka ingestion for notification-service
+===========================================
+Optional second way in, next to the REST endpoints:
+
+    python consumer.py
+
+Consumes NOTIFICATIONS_TOPIC (transfer-processor publishes there with
+NOTIFY_TRANSPORT=kafka). Every record is one notification in the same format
+as a /notifications/batch item and goes through the same handlers -> digest ->
+dispatcher path.
+
+- records are keyed by recipient, so all notifications for a user reach the
+  same consumer and the digest window coalesces them
+- offsets are committed after each poll, up to the last record handed to the
+  dispatcher. Like the REST path, messages accepted but not yet delivered are
+  lost if the process is killed; a normal shutdown flushes the digest and
+  drains the queues
+- queue full -> the partition is rewound to that record and the consumer backs
+  off before the next poll, so a slow provider shows up as lag instead of lost
+  notifications - and the consumer never blocks long enough inside one poll to
+  exceed max_poll_interval_ms
+- invalid records (bad JSON, missing fields, a handler that raises) are logged
+  and skipped - one poison record never stalls the topic
+"""
+
+import json
+import logging
+import os
+import time
+
+from kafka import KafkaConsumer
+from kafka.structs import OffsetAndMetadata
+from prometheus_client import start_http_server
+
+from app import handle_notification, digest, dispatcher
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+KAFKA_BOOTSTRAP_SERVERS = os.environ.get('KAFKA_BOOTSTRAP_SERVERS', 'localhost:9092')
+NOTIFICATIONS_TOPIC = os.environ.get('NOTIFICATIONS_TOPIC', 'notifications')
+NOTIFY_CONSUMER_MAX_RECORDS = int(os.environ.get('NOTIFY_CONSUMER_MAX_RECORDS', 500))
+METRICS_PORT = int(os.environ.get('METRICS_PORT', 9103))
+NOTIFY_CONSUMER_BACKOFF_MAX = float(os.environ.get('NOTIFY_CONSUMER_BACKOFF_MAX', 5))
+
+
+def handle_record(record):
+    """True when the record is done with (queued or skipped), False when the queue is full"""
+    try:
+        value = json.loads(record.value.decode('utf-8'))
+        result, status_code = handle_notification(value)
+    except Exception as e:
+        logger.error(f"❌ Skipping unprocessable notification {record.topic}[{record.partition}]@{record.offset}: "
+                     f"{e!r} | {record.value[:500]!r}")
+        return True
+
+    if status_code == 503:
+        return False
+    if status_code >= 400:
+        logger.warning(f"⚠️ Skipping invalid notification: {result.get('error')} | {json.dumps(value)}")
+    return True
+
+
+def main():
+    # logging כבר מוגדר ב-app.py
+    start_http_server(METRICS_PORT)
+
+    consumer = KafkaConsumer(
+        NOTIFICATIONS_TOPIC,
+        bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+        # JSON מפוענח ב-handle_record - הודעה פגומה לא מפילה את ה-poll
+        group_id='notification-service',
+        auto_offset_reset='earliest',
+        enable_auto_commit=False,
+        max_poll_interval_ms=300000  # 5 minutes
+    )
+
+    logger.info(f"👂 Consuming notifications from '{NOTIFICATIONS_TOPIC}'...")
+
+    backoff = 0
+    try:
+        while True:
+            messages = consumer.poll(timeout_ms=1000, max_records=NOTIFY_CONSUMER_MAX_RECORDS)
+
+            offsets = {}
+            queue_full = False
+            for topic_partition, records in messages.items():
+                for record in records:
+                    if not handle_record(record):
+                        # תור מלא - חוזרים לרשומה הזו ב-poll הבא, לא מחכים בתוך ה-poll
+                        consumer.seek(topic_partition, record.offset)
+                        queue_full = True
+                        break
+                    offsets[topic_partition] = OffsetAndMetadata(record.offset + 1, None)
+
+            if offsets:
+                consumer.commit(offsets)
+
+            if queue_full:
+                backoff = min(backoff * 2 or 0.1, NOTIFY_CONSUMER_BACKOFF_MAX)
+                logger.warning(f"⚠️ Notification queue full, backing off {backoff:.1f}s")
+                time.sleep(backoff)
+            else:
+                backoff = 0
+    except KeyboardInterrupt:
+        logger.info("🛑 Shutting down notification consumer...")
+    finally:
+        consumer.close()
+        digest.close()
+        dispatcher.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+🗞️ Digest coalescing for transfer confirmations
+================================================
+A bulk settlement run can complete dozens of transfers for the same user
+within seconds - one email per transfer floods the user and the provider.
+
+Transfer confirmations are held per (channel, recipient) for
+NOTIFY_DIGEST_WINDOW seconds after the first one arrives. When the window
+closes they are handed to the dispatcher as one message: the original
+message if only one arrived, otherwise a digest that lists all of them. A
+recipient with NOTIFY_DIGEST_MAX_ITEMS pending is flushed right away.
+
+NOTIFY_DIGEST_WINDOW=0 turns coalescing off - every confirmation is sent on
+its own, right away.
+
+Buffers are per process: under gunicorn two workers may each send a digest
+to the same user. The Kafka consumer (consumer.py) sees every notification
+for a recipient in one process, so it coalesces best.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+
+from prometheus_client import Counter
+
+from dispatcher import QueueFull
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+NOTIFY_DIGEST_WINDOW = float(os.environ.get('NOTIFY_DIGEST_WINDOW', 10))
+NOTIFY_DIGEST_MAX_ITEMS = int(os.environ.get('NOTIFY_DIGEST_MAX_ITEMS', 50))
+
+# ==========================================
+# Metrics Definitions
+# ==========================================
+
+notification_digests_total = Counter(
+    'notification_digests_total',
+    'Digest messages handed to the dispatcher',
+    ['channel']
+)
+
+notification_digested_total = Counter(
+    'notification_digested_total',
+    'Notifications merged into a digest instead of being sent one by one',
+    ['channel']
+)
+
+
+class NotificationDigest:
+
+    def __init__(self, dispatcher, window=NOTIFY_DIGEST_WINDOW, max_items=NOTIFY_DIGEST_MAX_ITEMS):
+        self.dispatcher = dispatcher
+        self.window = window
+        self.max_items = max_items
+        self._pending = {}   # (channel, to) -> {'deadline', 'messages'}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._pid = None
+        atexit.register(self.close)
+
+    def add(self, messages):
+        """
+        Hold messages for the digest - returns their ids. Raises QueueFull up
+        front if a channel queue is already full, so callers get backpressure
+        instead of a digest that is dropped later.
+        """
+        for channel in {message['channel'] for message in messages}:
+            if self.dispatcher.is_full(channel):
+                raise QueueFull(f"{channel} queue is full")
+
+        messages = [{**message, 'id': str(uuid.uuid4())} for message in messages]
+        ready = []
+        with self._lock:
+            now = time.time()
+            for message in messages:
+                key = (message['channel'], message['to'])
+                entry = self._pending.setdefault(key, {'deadline': now + self.window, 'messages': []})
+                entry['messages'].append(message)
+                if self.window <= 0 or len(entry['messages']) >= self.max_items:
+                    ready.append(self._pending.pop(key)['messages'])
+            if self.window > 0:
+                self._wakeup.notify()
+
+        for group in ready:
+            self._flush(group)
+        if self.window > 0:
+            self._ensure_started()
+        return [message['id'] for message in messages]
+
+    def _ensure_started(self):
+        # thread לא שורד fork - כל worker של gunicorn מפעיל אחד משלו
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._thread = threading.Thread(target=self._run, name='notify-digest', daemon=True)
+                    self._thread.start()
+                    self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                now = time.time()
+                due = [key for key, entry in self._pending.items() if entry['deadline'] <= now]
+                groups = [self._pending.pop(key)['messages'] for key in due]
+                if not groups:
+                    next_deadline = min((entry['deadline'] for entry in self._pending.values()), default=None)
+                    self._wakeup.wait(timeout=None if next_deadline is None else next_deadline - now)
+                    continue
+            for group in groups:
+                self._flush(group)
+
+    def _flush(self, messages):
+        message = messages[0] if len(messages) == 1 else build_digest(messages)
+        if len(messages) > 1:
+            notification_digests_total.labels(channel=message['channel']).inc()
+            notification_digested_total.labels(channel=message['channel']).inc(len(messages))
+            logger.info(f"🗞️ Digest of {len(messages)} notifications to {message['to']}")
+        try:
+            self.dispatcher.enqueue(message)
+        except QueueFull as e:
+            logger.error(f"❌ Dropping {len(messages)} notifications to {message['to']}: {e}")
+
+    def close(self):
+        """Hand everything still waiting to the dispatcher (shutdown)"""
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            groups = [entry['messages'] for entry in self._pending.values()]
+            self._pending.clear()
+        for group in groups:
+            self._flush(group)
+
+
+def build_digest(messages):
+    lines = '\n'.join(f"- {message['summary']}" for message in messages)
+    return {
+        'channel': messages[0]['channel'],
+        'to': messages[0]['to'],
+        'subject': f"{len(messages)} Transfer Confirmations",
+        'body': f"{len(messages)} transfers were made from your accounts:\n\n{lines}",
+        'parts': [message['id'] for message in messages]
+    }
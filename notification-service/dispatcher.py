@@ -0,0 +1,200 @@
+"""
+📬 Asynchronous delivery for notification-service
+=================================================
+The endpoints validate a notification, enqueue() it and answer 202 - no
+request ever waits on a provider.
+
+Every channel (email / sms) has its own bounded queue and its own pool of
+worker threads, so a slow SMS provider never holds up email:
+
+- NOTIFY_<CHANNEL>_WORKERS threads per channel is the concurrency limit - at
+  most that many provider calls in flight per channel, per gunicorn worker
+  process
+- a worker takes up to provider.max_batch messages (whatever arrived within
+  NOTIFY_LINGER seconds) and sends them in one provider call
+- failed messages are retried with exponential backoff (NOTIFY_RETRY_BASE,
+  doubling, up to NOTIFY_RETRY_MAX) for NOTIFY_MAX_ATTEMPTS attempts, then
+  dropped and logged. Rejected messages (retryable=False) are not retried
+- queue full (NOTIFY_QUEUE_SIZE) -> enqueue() raises QueueFull and the
+  endpoint answers 503, so callers back off instead of piling up memory
+
+The queues live in memory: messages still queued when a process is killed are
+lost. On a normal shutdown close() gives the workers NOTIFY_DRAIN_TIMEOUT
+seconds to drain.
+
+Metrics: notification_queue_depth, notification_in_flight,
+notification_delivery_seconds (enqueue -> delivered), notification_deliveries_total.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from providers import ProviderError
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+NOTIFY_QUEUE_SIZE = int(os.environ.get('NOTIFY_QUEUE_SIZE', 10000))
+NOTIFY_LINGER = float(os.environ.get('NOTIFY_LINGER', 0.05))
+NOTIFY_MAX_ATTEMPTS = int(os.environ.get('NOTIFY_MAX_ATTEMPTS', 5))
+NOTIFY_RETRY_BASE = float(os.environ.get('NOTIFY_RETRY_BASE', 0.5))
+NOTIFY_RETRY_MAX = float(os.environ.get('NOTIFY_RETRY_MAX', 30))
+NOTIFY_DRAIN_TIMEOUT = float(os.environ.get('NOTIFY_DRAIN_TIMEOUT', 10))
+CHANNEL_WORKERS = {
+    'email': int(os.environ.get('NOTIFY_EMAIL_WORKERS', 4)),
+    'sms': int(os.environ.get('NOTIFY_SMS_WORKERS', 2))
+}
+
+# ==========================================
+# Metrics Definitions
+# ==========================================
+
+notification_queue_depth = Gauge(
+    'notification_queue_depth',
+    'Notifications waiting in the channel queue',
+    ['channel'],
+    multiprocess_mode='livesum'
+)
+
+notification_in_flight = Gauge(
+    'notification_in_flight',
+    'Notifications taken by a worker and not finished yet (incl. retry backoff)',
+    ['channel'],
+    multiprocess_mode='livesum'
+)
+
+notification_delivery_seconds = Histogram(
+    'notification_delivery_seconds',
+    'Time from enqueue to delivered',
+    ['channel'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+
+notification_deliveries_total = Counter(
+    'notification_deliveries_total',
+    'Finished notifications',
+    ['channel', 'result']   # result: sent | rejected | failed | dropped
+)
+
+
+class QueueFull(Exception):
+    """The channel queue has NOTIFY_QUEUE_SIZE notifications waiting"""
+
+
+class NotificationDispatcher:
+
+    def __init__(self, providers, workers=CHANNEL_WORKERS):
+        self.providers = providers   # channel -> provider
+        self.workers = workers
+        self._queues = {channel: queue.Queue(maxsize=NOTIFY_QUEUE_SIZE) for channel in providers}
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def enqueue(self, message):
+        """Queue a message ({channel, to, subject?, body}) - returns its id. Raises QueueFull"""
+        self._ensure_started()
+        message = {**message, 'id': message.get('id') or str(uuid.uuid4()), 'enqueued_at': time.time()}
+        channel_queue = self._queues[message['channel']]
+        try:
+            channel_queue.put_nowait(message)
+        except queue.Full:
+            notification_deliveries_total.labels(channel=message['channel'], result='dropped').inc()
+            raise QueueFull(f"{message['channel']} queue is full ({NOTIFY_QUEUE_SIZE})")
+        notification_queue_depth.labels(channel=message['channel']).set(channel_queue.qsize())
+        return message['id']
+
+    def is_full(self, channel):
+        return self._queues[channel].full()
+
+    def _ensure_started(self):
+        # threads לא שורדים fork - כל worker של gunicorn מפעיל pool משלו
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._threads = [
+                        threading.Thread(target=self._run, args=(channel,), name=f'notify-{channel}-{i}', daemon=True)
+                        for channel in self.providers
+                        for i in range(self.workers.get(channel, 1))
+                    ]
+                    for thread in self._threads:
+                        thread.start()
+                    self._pid = os.getpid()
+
+    def _next_batch(self, channel):
+        """Block for the first message, then collect more until max_batch or linger expires"""
+        channel_queue = self._queues[channel]
+        batch = [channel_queue.get()]
+        deadline = time.time() + NOTIFY_LINGER
+        while len(batch) < self.providers[channel].max_batch:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(channel_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        notification_queue_depth.labels(channel=channel).set(channel_queue.qsize())
+        return batch
+
+    def _run(self, channel):
+        while True:
+            batch = self._next_batch(channel)
+            notification_in_flight.labels(channel=channel).inc(len(batch))
+            try:
+                self._deliver(channel, batch)
+            except Exception as e:
+                logger.error(f"❌ {channel} worker error, dropping {len(batch)} notifications: {e}")
+                notification_deliveries_total.labels(channel=channel, result='failed').inc(len(batch))
+            finally:
+                notification_in_flight.labels(channel=channel).dec(len(batch))
+                for _ in batch:
+                    self._queues[channel].task_done()
+
+    def _deliver(self, channel, batch):
+        provider = self.providers[channel]
+        pending = batch
+        for attempt in range(1, NOTIFY_MAX_ATTEMPTS + 1):
+            try:
+                errors = provider.send_batch(pending)
+            except Exception as e:
+                errors = [e] * len(pending)
+
+            retry = []
+            for message, error in zip(pending, errors):
+                if error is None:
+                    notification_deliveries_total.labels(channel=channel, result='sent').inc()
+                    notification_delivery_seconds.labels(channel=channel).observe(time.time() - message['enqueued_at'])
+                elif isinstance(error, ProviderError) and not error.retryable:
+                    logger.warning(f"🚫 {channel} {message['id']} to {message['to']} rejected: {error}")
+                    notification_deliveries_total.labels(channel=channel, result='rejected').inc()
+                else:
+                    retry.append(message)
+
+            if not retry:
+                return
+            pending = retry
+            if attempt < NOTIFY_MAX_ATTEMPTS:
+                delay = min(NOTIFY_RETRY_BASE * (2 ** (attempt - 1)), NOTIFY_RETRY_MAX)
+                logger.warning(f"⚠️ {len(pending)} {channel} notifications failed, retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+        logger.error(f"❌ Giving up on {len(pending)} {channel} notifications after {NOTIFY_MAX_ATTEMPTS} attempts: "
+                     f"{[message['id'] for message in pending]}")
+        notification_deliveries_total.labels(channel=channel, result='failed').inc(len(pending))
+
+    def close(self, timeout=NOTIFY_DRAIN_TIMEOUT):
+        """Give the workers a chance to drain the queues on shutdown"""
+        if self._pid != os.getpid():
+            return
+        deadline = time.time() + timeout
+        while any(q.unfinished_tasks for q in self._queues.values()) and time.time() < deadline:
+            time.sleep(0.05)
@@ -0,0 +1,69 @@
+"""
+🦄 gunicorn configuration for the Flask services
+================================================
+Copy this file to each service directory:
+- account-service/gunicorn.conf.py
+- transaction-service/gunicorn.conf.py
+- notification-service/gunicorn.conf.py
+
+    gunicorn -c gunicorn.conf.py app:app
+
+`python app.py` still starts the single-process dev server (FLASK_DEBUG=true for
+the debugger) - use it only for local development.
+
+- GUNICORN_WORKERS processes x GUNICORN_THREADS threads (gthread workers)
+- preload_app: the app is imported once in the master and workers are forked
+  from it, so spawning a worker is cheap. Anything that holds sockets is
+  re-created per worker - the DB pools are disposed in post_fork; redis-py and
+  the user-service gRPC channel notice the new pid by themselves
+- graceful reload: `kill -HUP <master>` starts fresh workers and lets the old
+  ones finish their requests (up to GUNICORN_GRACEFUL_TIMEOUT). With preload_app
+  new code needs a restart (or USR2 + QUIT for a zero-downtime binary upgrade)
+- Prometheus: each worker writes its metrics to PROMETHEUS_MULTIPROC_DIR and
+  /metrics merges them (metrics_middleware.metrics_registry)
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+
+# חייב לקרות לפני ש-prometheus_client נטען (preload טוען את האפליקציה אחרי הקובץ הזה)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+preload_app = True
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    # קבצים של workers מריצה קודמת היו נספרים שוב
+    multiproc_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # connections שנפתחו ב-master (אם בכלל) לא משותפים בין processes
+    db = sys.modules.get('db')
+    if db is not None:
+        for engine in (db.engine, db.replica_engine):
+            if engine is not None:
+                try:
+                    engine.dispose(close=False)   # SQLAlchemy >= 1.4.33: לא נוגעים ב-sockets של ה-master
+                except TypeError:
+                    engine.dispose()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -8,7 +8,10 @@ Copy this file to each service directory:
 """
 
 from flask import request, g
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import (
+    Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, multiprocess
+)
+import os
 import time
 import re
 
@@ -53,6 +56,19 @@ def normalize_path(path):
     return path
 
 
+def metrics_registry():
+    """
+    Under gunicorn every worker process keeps its own metric values in
+    PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py). /metrics is answered by
+    one worker, so it has to merge all of them.
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
 def setup_metrics(app):
     """
     Setup Prometheus metrics middleware for Flask app
@@ -105,4 +121,4 @@ def setup_metrics(app):
         Prometheus metrics endpoint
         Prometheus will scrape this endpoint every 15 seconds
         """
-        return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST} 
+        return generate_latest(metrics_registry()), 200, {'Content-Type': CONTENT_TYPE_LATEST} 
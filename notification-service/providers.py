@@ -0,0 +1,98 @@
+"""
+📮 Delivery providers for notification-service
+==============================================
+A provider delivers one batch of messages for one channel (email / sms):
+
+    provider.send_batch(messages) -> [None | ProviderError, ...]   # same order
+
+None means delivered. A ProviderError with retryable=False (bad address,
+rejected content) is never retried; anything else - including an exception
+raised by send_batch itself (timeout, connection error) - is retried by the
+dispatcher with exponential backoff. `max_batch` is the most messages the
+provider accepts in one call.
+
+- log  - only logs the message (EMAIL_ENABLED / SMS_ENABLED = false)
+- stub - a fake remote provider for local and load testing: NOTIFY_STUB_LATENCY
+         seconds per call, NOTIFY_STUB_FAILURE_RATE of messages fail (retryable),
+         addresses ending with "invalid" (or not a string) are rejected
+
+Real providers (SendGrid, SES, Twilio...) go into PROVIDERS and are selected
+with EMAIL_PROVIDER / SMS_PROVIDER.
+"""
+
+import logging
+import os
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+NOTIFY_STUB_LATENCY = float(os.environ.get('NOTIFY_STUB_LATENCY', 0.2))
+NOTIFY_STUB_FAILURE_RATE = float(os.environ.get('NOTIFY_STUB_FAILURE_RATE', 0))
+NOTIFY_STUB_BATCH_MAX = int(os.environ.get('NOTIFY_STUB_BATCH_MAX', 50))
+
+
+class ProviderError(Exception):
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def describe(message):
+    if message['channel'] == 'email':
+        return f"📧 Email to {message['to']}: {message['subject']}"
+    return f"📱 SMS to {message['to']}: {message['body']}"
+
+
+class LogProvider:
+    max_batch = 500
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    def send_batch(self, messages):
+        for message in messages:
+            logger.info(f"{describe(message)} (logged only)")
+        return [None] * len(messages)
+
+
+class StubProvider:
+
+    def __init__(self, channel, latency=NOTIFY_STUB_LATENCY, failure_rate=NOTIFY_STUB_FAILURE_RATE,
+                 max_batch=NOTIFY_STUB_BATCH_MAX):
+        self.channel = channel
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.max_batch = max_batch
+
+    def send_batch(self, messages):
+        # קריאה אחת לכל ה-batch - כמו API של provider אמיתי
+        time.sleep(self.latency)
+        results = []
+        for message in messages:
+            to = message.get('to')
+            # נמען פגום נדחה לבד - לא מפיל את שאר ה-batch
+            if not isinstance(to, str) or not to or to.endswith('invalid'):
+                results.append(ProviderError(f"stub: rejected recipient {to!r}", retryable=False))
+            elif random.random() < self.failure_rate:
+                results.append(ProviderError('stub: simulated provider failure'))
+            else:
+                logger.info(describe(message))
+                results.append(None)
+        return results
+
+
+PROVIDERS = {
+    'log': LogProvider,
+    'stub': StubProvider
+}
+
+
+def get_provider(channel, enabled):
+    """Provider for a channel - `log` unless the channel is enabled"""
+    name = os.environ.get(f'{channel.upper()}_PROVIDER', 'stub') if enabled else 'log'
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown {channel} provider '{name}' (one of: {', '.join(PROVIDERS)})")
+    return PROVIDERS[name](channel)
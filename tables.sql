@@ -1,5 +1,6 @@
 -- Generated from: https://drawsql.app/teams/get-shit-done/diagrams/oribookkeeping
 -- How to connect: PGPASSWORD='example' psql -U postgres -h localhost -d mydatabase
+-- Baseline schema. שינויים מכאן והלאה - ב-migrations/ (רצות דרך migrations/apply.sh)
 
 CREATE TABLE IF NOT EXISTS "users" (
     "id" UUID NOT NULL,
@@ -0,0 +1,159 @@
+"""
+🔐 JWT Auth for Flask services
+==============================
+Copy this file to each service directory:
+- account-service/auth.py
+- transaction-service/auth.py
+
+Usage:
+    from auth import require_auth
+
+    @app.route('/accounts')
+    @require_auth
+    def list_accounts():
+        user_id = g.user_id
+
+Verified tokens are kept in a bounded LRU cache keyed by the token's
+SHA-256, so repeated requests with the same token (e.g. /status polling)
+skip the signature check. An entry never outlives the token's `exp` claim
+or AUTH_CACHE_TTL, whichever comes first.
+
+AUTH_MODE:
+- local  (default) - verify the JWT signature here
+- remote           - ask user-service (VerifyToken, see user_client.py), which
+                     also checks revocation. The answer is cached for
+                     AUTH_REMOTE_CACHE_TTL, so a revoked token keeps working
+                     here for at most that long. If user-service is
+                     unreachable the request gets 503.
+"""
+
+from flask import request, jsonify, g
+from prometheus_client import Counter
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import threading
+import time
+import os
+import jwt
+
+# ==========================================
+# Configuration
+# ==========================================
+
+JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'dev-secret-key')
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', 10000))
+AUTH_CACHE_TTL = float(os.environ.get('AUTH_CACHE_TTL', 300))
+AUTH_MODE = os.environ.get('AUTH_MODE', 'local')
+AUTH_REMOTE_CACHE_TTL = float(os.environ.get('AUTH_REMOTE_CACHE_TTL', 30))
+
+# ==========================================
+# Metrics Definitions
+# ==========================================
+
+auth_token_cache_total = Counter(
+    'auth_token_cache_total',
+    'Token verification cache lookups',
+    ['result']
+)
+
+
+class TokenCache:
+    """Thread-safe LRU of token hash -> (user_id, expires_at)"""
+
+    def __init__(self, max_size=AUTH_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user_id, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user_id
+
+    def put(self, key, user_id, expires_at):
+        with self._lock:
+            self._entries[key] = (user_id, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+class AuthUnavailable(Exception):
+    """AUTH_MODE=remote and user-service did not answer"""
+
+
+def _verify_local(token):
+    """(user_id, exp) or None"""
+    try:
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=['HS256'])
+        return payload['user_id'], payload.get('exp', float('inf'))
+    except Exception:
+        return None
+
+
+def _verify_remote(token):
+    """(user_id, exp) or None - raises AuthUnavailable"""
+    # import עצל - במצב local לא צריך gRPC ולא את ה-stubs
+    from user_client import user_client, UserServiceUnavailable
+    try:
+        result = user_client.verify_token(token)
+    except UserServiceUnavailable as e:
+        raise AuthUnavailable(str(e))
+    if not result.valid:
+        return None
+    return result.user_id, result.expires_at or float('inf')
+
+
+def verify_token(token):
+    """Return the token's user_id, or None if the token is invalid/expired/revoked"""
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    user_id = token_cache.get(key)
+    if user_id is not None:
+        auth_token_cache_total.labels(result='hit').inc()
+        return user_id
+
+    auth_token_cache_total.labels(result='miss').inc()
+    if AUTH_MODE == 'remote':
+        verified, ttl = _verify_remote(token), AUTH_REMOTE_CACHE_TTL
+    else:
+        verified, ttl = _verify_local(token), AUTH_CACHE_TTL
+    if verified is None:
+        return None
+
+    user_id, exp = verified
+    token_cache.put(key, user_id, min(exp, time.time() + ttl))
+    return user_id
+
+
+def require_auth(view):
+    """Decorator - 401 without a valid Bearer token, otherwise sets g.user_id"""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return jsonify({"error": "Unauthorized"}), 401
+
+        try:
+            user_id = verify_token(auth_header[7:])
+        except AuthUnavailable:
+            return jsonify({"error": "Authentication service unavailable"}), 503
+        if not user_id:
+            return jsonify({"error": "Invalid token"}), 401
+
+        g.user_id = user_id
+        return view(*args, **kwargs)
+
+    return wrapper
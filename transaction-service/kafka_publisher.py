@@ -0,0 +1,111 @@
+"""
+📨 Kafka publishing for the transaction-service outbox relay
+=============================================================
+Events are written to the outbox table in the same DB transaction as the
+state change (see outbox.py); only the relay talks to Kafka.
+
+`publish_batch()` hands a batch of events to kafka-python's background sender
+(linger / batch size / compression from env), blocks until every one is
+acknowledged and raises on the first failure. Nothing is re-queued here - the
+relay rolls back and retries the whole batch, in outbox order.
+
+Deliveries are counted in `kafka_events_published_total{result="delivered"|"failed"}`.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import json
+
+from kafka import KafkaProducer
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# Configuration
+# ==========================================
+
+KAFKA_LINGER_MS = int(os.environ.get('KAFKA_LINGER_MS', 5))
+KAFKA_BATCH_SIZE = int(os.environ.get('KAFKA_BATCH_SIZE', 64 * 1024))
+KAFKA_COMPRESSION_TYPE = os.environ.get('KAFKA_COMPRESSION_TYPE', 'gzip') or None
+KAFKA_ACKS = os.environ.get('KAFKA_ACKS', 'all')
+KAFKA_SEND_RETRIES = int(os.environ.get('KAFKA_SEND_RETRIES', 5))
+KAFKA_FLUSH_TIMEOUT = float(os.environ.get('KAFKA_FLUSH_TIMEOUT', 30))
+
+if KAFKA_ACKS != 'all':
+    KAFKA_ACKS = int(KAFKA_ACKS)
+
+# ==========================================
+# Metrics Definitions
+# ==========================================
+
+kafka_events_published_total = Counter(
+    'kafka_events_published_total',
+    'Kafka events by delivery result',
+    ['topic', 'result']
+)
+
+
+class KafkaPublisher:
+    """Batch publisher for the outbox relay - every batch is acknowledged or raises"""
+
+    def __init__(self, bootstrap_servers):
+        self.bootstrap_servers = bootstrap_servers
+        self._producer = None
+        self._producer_pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _get_producer(self):
+        """Create the producer lazily (and again after a fork)"""
+        if self._producer is not None and self._producer_pid == os.getpid():
+            return self._producer
+
+        with self._lock:
+            if self._producer is None or self._producer_pid != os.getpid():
+                self._producer = KafkaProducer(
+                    bootstrap_servers=self.bootstrap_servers,
+                    value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+                    key_serializer=lambda k: k.encode('utf-8') if k else None,
+                    acks=KAFKA_ACKS,
+                    retries=KAFKA_SEND_RETRIES,
+                    # שומר על סדר ההודעות גם כשיש retries
+                    max_in_flight_requests_per_connection=1,
+                    linger_ms=KAFKA_LINGER_MS,
+                    batch_size=KAFKA_BATCH_SIZE,
+                    compression_type=KAFKA_COMPRESSION_TYPE
+                )
+                self._producer_pid = os.getpid()
+        return self._producer
+
+    def publish_batch(self, events, timeout=KAFKA_FLUSH_TIMEOUT):
+        """
+        Send (topic, value, key) events and wait until all are acknowledged.
+        Raises on the first failed delivery and does NOT re-queue anything -
+        the caller (outbox relay) rolls back and retries the whole batch.
+        """
+        producer = self._get_producer()
+        sent = [
+            (topic, producer.send(topic, key=key, value=value))
+            for topic, value, key in events
+        ]
+        producer.flush(timeout=timeout)
+
+        for topic, future in sent:
+            try:
+                future.get(timeout=timeout)
+            except Exception:
+                kafka_events_published_total.labels(topic=topic, result='failed').inc()
+                raise
+            kafka_events_published_total.labels(topic=topic, result='delivered').inc()
+
+    def close(self):
+        if self._producer is not None and self._producer_pid == os.getpid():
+            try:
+                self._producer.flush(timeout=KAFKA_FLUSH_TIMEOUT)
+                self._producer.close(timeout=KAFKA_FLUSH_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Failed to flush Kafka producer on shutdown: {e}")
+            self._producer = None
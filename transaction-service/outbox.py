@@ -0,0 +1,147 @@
+"""
+📤 Transactional Outbox for transfer events
+===========================================
+Request handlers never talk to Kafka. They call `enqueue_event()` with the
+same connection that writes `transfer_requests`, so the event row commits
+(or rolls back) together with the state change.
+
+A separate relay process (`python outbox.py`) drains the table in large
+batches:
+
+    BEGIN
+    SELECT pg_try_advisory_xact_lock(...)      (another relay has it -> skip)
+    DELETE FROM outbox WHERE id IN (
+        SELECT id ... ORDER BY id LIMIT :batch FOR UPDATE SKIP LOCKED
+    ) RETURNING ...
+    -> bulk publish + wait for acks
+    COMMIT            (on any publish failure: ROLLBACK, rows come back)
+
+Batches are published in id order, one at a time: each batch is acked by
+Kafka and committed before the next one is read, so the events of a transfer
+(requests before approvals) reach Kafka in the order they were written. Two
+relays publishing different id ranges concurrently would break that, so every
+batch takes a transaction-scoped advisory lock first - extra relays are hot
+standbys that take over when the active one stops, never parallel publishers.
+
+Delivery is at-least-once: a crash between the Kafka ack and the COMMIT
+re-publishes that batch, which the transfer-processor tolerates.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 500))
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 0.2))
+
+# מפתח ה-advisory lock - relay אחד בכל רגע מפרסם
+OUTBOX_RELAY_LOCK_KEY = 7_240_001
+
+
+def enqueue_event(connection, topic, payload, key=None):
+    """Write an event to the outbox inside the caller's transaction"""
+    connection.execute(
+        text("""
+            INSERT INTO outbox (topic, message_key, payload, created_at)
+            VALUES (:topic, :message_key, :payload, :created_at)
+        """),
+        {
+            'topic': topic,
+            'message_key': key,
+            'payload': json.dumps(payload),
+            'created_at': datetime.now()
+        }
+    )
+
+
+# ==========================================
+# Relay
+# ==========================================
+
+def relay_batch(engine, publisher, batch_size=OUTBOX_BATCH_SIZE):
+    """Publish one batch of outbox rows; returns how many were sent"""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            locked = connection.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': OUTBOX_RELAY_LOCK_KEY}
+            ).scalar()
+            if not locked:
+                # relay אחר באמצע batch - לא מפרסמים במקביל (סדר ההודעות)
+                transaction.rollback()
+                return 0
+
+            rows = connection.execute(
+                text("""
+                    DELETE FROM outbox
+                    WHERE id IN (
+                        SELECT id FROM outbox
+                        ORDER BY id
+                        LIMIT :batch_size
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, topic, message_key, payload
+                """),
+                {'batch_size': batch_size}
+            ).fetchall()
+
+            if rows:
+                # DELETE ... RETURNING לא שומר על סדר - ממיינים לפי id
+                rows.sort(key=lambda row: row.id)
+                publisher.publish_batch(
+                    (row.topic, row.payload, row.message_key) for row in rows
+                )
+
+            transaction.commit()
+            return len(rows)
+        except Exception:
+            transaction.rollback()
+            raise
+
+
+def main():
+    """Relay loop - tails the outbox and bulk-publishes to Kafka"""
+    from kafka_publisher import KafkaPublisher
+    from db import engine
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    bootstrap_servers = os.environ.get('KAFKA_BOOTSTRAP_SERVERS', 'kafka:9092')
+
+    publisher = KafkaPublisher(bootstrap_servers)
+
+    logger.info(f"🚀 Outbox relay started (batch_size={OUTBOX_BATCH_SIZE})")
+
+    try:
+        while True:
+            try:
+                sent = relay_batch(engine, publisher)
+            except Exception as e:
+                logger.error(f"❌ Outbox relay batch failed, will retry: {e}")
+                time.sleep(1)
+                continue
+
+            if sent:
+                logger.info(f"📨 Relayed {sent} outbox events")
+
+            # רק אם ה-batch לא היה מלא - אין עוד עבודה מיידית
+            if sent < OUTBOX_BATCH_SIZE:
+                time.sleep(OUTBOX_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        logger.info("🛑 Shutting down outbox relay...")
+    finally:
+        publisher.close()
+
+
+if __name__ == '__main__':
+    main()
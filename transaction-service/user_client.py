@@ -0,0 +1,77 @@
+"""
+👤 user-service gRPC client for the Flask services
+==================================================
+Copy this file and user_service.proto to each service directory:
+- account-service/user_client.py
+- transaction-service/user_client.py
+
+The stubs are generated from user_service.proto in the Dockerfile. For local
+runs: python -m grpc_tools.protoc -I. --python_out=. --grpc_python_out=. user_service.proto
+
+One long-lived HTTP/2 channel per process, created on first use and again
+after a fork. Concurrent requests share it, so there is no connect per call.
+auth.py caches the results (AUTH_MODE=remote), so only a cache miss costs a
+network round trip.
+"""
+
+import os
+import threading
+
+import grpc
+
+# Configuration
+USER_SERVICE_URL = os.environ.get('USER_SERVICE_URL', 'user-service:5001')
+USER_SERVICE_TIMEOUT = float(os.environ.get('USER_SERVICE_TIMEOUT', 2))
+
+
+class UserServiceUnavailable(Exception):
+    """user-service could not be reached / did not answer in time"""
+
+
+class UserServiceClient:
+
+    def __init__(self, target=USER_SERVICE_URL):
+        self.target = target
+        self._stub = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_stub(self):
+        # channel של gRPC לא שורד fork (gunicorn workers) - יוצרים מחדש בכל process
+        if self._stub is None or self._pid != os.getpid():
+            with self._lock:
+                if self._stub is None or self._pid != os.getpid():
+                    import user_service_pb2_grpc
+                    channel = grpc.insecure_channel(self.target, options=[
+                        ('grpc.keepalive_time_ms', 30000),
+                        ('grpc.keepalive_timeout_ms', 10000),
+                        ('grpc.keepalive_permit_without_calls', 1),
+                    ])
+                    self._stub = user_service_pb2_grpc.UserServiceStub(channel)
+                    self._pid = os.getpid()
+        return self._stub
+
+    def verify_token(self, token):
+        """VerifyTokenResponse (valid, user_id, expires_at, error)"""
+        import user_service_pb2
+        try:
+            return self._get_stub().VerifyToken(
+                user_service_pb2.VerifyTokenRequest(token=token),
+                timeout=USER_SERVICE_TIMEOUT
+            )
+        except grpc.RpcError as e:
+            raise UserServiceUnavailable(str(e))
+
+    def verify_tokens(self, tokens):
+        """[VerifyTokenResponse] in the same order - one round trip"""
+        import user_service_pb2
+        try:
+            return list(self._get_stub().VerifyTokens(
+                user_service_pb2.VerifyTokensRequest(tokens=tokens),
+                timeout=USER_SERVICE_TIMEOUT
+            ).results)
+        except grpc.RpcError as e:
+            raise UserServiceUnavailable(str(e))
+
+
+user_client = UserServiceClient()
@@ -0,0 +1,46 @@
+"""
+🔢 Account cache versions
+=========================
+Copy this file to each service that changes accounts:
+- account-service/account_versions.py
+- transaction-service/account_versions.py
+- transfer-processor/account_versions.py
+
+account-service caches account records under `account:<id>:<version>` and
+owner account lists under `owner_accounts:<owner_id>:<version>`.
+
+Whatever changes an account bumps its version right after the DB commit and
+before it answers its caller. The next read then misses and goes to Postgres,
+so once a deposit, withdrawal or transfer has returned, no read serves the
+old balance. Old entries are never deleted - nothing reads them any more,
+and they expire on their TTL.
+"""
+
+import time
+
+ACCOUNT_VERSION_KEY = 'account_version:{}'
+OWNER_ACCOUNTS_VERSION_KEY = 'owner_accounts_version:{}'
+
+
+def bump_versions(redis_client, keys):
+    """
+    SET NX seeds a missing key with a time-based value, so a flushed Redis never
+    hands out a version number an in-process cache has already seen. INCR then
+    moves the version.
+    """
+    if not keys:
+        return
+    seed = time.time_ns()
+    pipeline = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipeline.set(key, seed, nx=True)
+        pipeline.incr(key)
+    pipeline.execute()
+
+
+def bump_account_versions(redis_client, account_ids):
+    bump_versions(redis_client, [ACCOUNT_VERSION_KEY.format(account_id) for account_id in set(account_ids)])
+
+
+def bump_owner_accounts_version(redis_client, owner_id):
+    bump_versions(redis_client, [OWNER_ACCOUNTS_VERSION_KEY.format(owner_id)])
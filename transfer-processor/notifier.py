@@ -0,0 +1,216 @@
+"""
+🔔 Asynchronous, batched notification dispatch for transfer-processor
+=====================================================================
+Settlement code calls `NotificationDispatcher.enqueue()` after the DB
+commit and moves on - it never waits on notification-service.
+
+A background thread drains the queue in batches (NOTIFY_BATCH_SIZE, or
+whatever arrived within NOTIFY_LINGER seconds) and sends each batch in one
+`POST /notifications/batch` over a pooled keep-alive `requests.Session`.
+
+- 5xx / timeouts / connection errors -> retried with exponential backoff
+- rejected items, or batches that exhaust NOTIFY_MAX_ATTEMPTS
+                                     -> pushed to the Redis dead-letter list
+- queue full                         -> dead-lettered immediately (never blocks)
+
+NOTIFY_TRANSPORT=kafka replaces the HTTP calls with KafkaNotificationPublisher:
+every notification is produced to NOTIFICATIONS_TOPIC, keyed by recipient, and
+notification-service's consumer (consumer.py) picks it up. kafka-python's own
+sender thread batches the records; failed deliveries go to the same
+dead-letter list.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import requests
+from kafka import KafkaProducer
+from kafka.errors import KafkaError
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+NOTIFY_QUEUE_SIZE = int(os.environ.get('NOTIFY_QUEUE_SIZE', 10000))
+NOTIFY_BATCH_SIZE = int(os.environ.get('NOTIFY_BATCH_SIZE', 100))
+NOTIFY_LINGER = float(os.environ.get('NOTIFY_LINGER', 0.2))
+NOTIFY_MAX_ATTEMPTS = int(os.environ.get('NOTIFY_MAX_ATTEMPTS', 5))
+NOTIFY_TIMEOUT = float(os.environ.get('NOTIFY_TIMEOUT', 5))
+NOTIFY_DEAD_LETTER_KEY = os.environ.get('NOTIFY_DEAD_LETTER_KEY', 'notifications:dead-letter')
+NOTIFICATIONS_TOPIC = os.environ.get('NOTIFICATIONS_TOPIC', 'notifications')
+
+
+class NotificationDispatcher:
+    """Bounded queue + background sender thread"""
+
+    def __init__(self, base_url, redis_client):
+        self.batch_url = f"{base_url}/notifications/batch"
+        self.redis_client = redis_client
+        self._queue = queue.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Session אחד עם keep-alive - בלי TCP handshake לכל batch
+        self._session = requests.Session()
+        self._session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+        atexit.register(self.close)
+
+    def enqueue(self, notification):
+        """Non-blocking - called on the settlement path"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(notification)
+        except queue.Full:
+            self._dead_letter([notification], 'queue full')
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name='notification-dispatcher', daemon=True
+                    )
+                    self._thread.start()
+
+    def _next_batch(self):
+        """Block for the first item, then collect more until the batch is full or linger expires"""
+        batch = [self._queue.get()]
+        deadline = time.time() + NOTIFY_LINGER
+        while len(batch) < NOTIFY_BATCH_SIZE:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                logger.error(f"Notification dispatcher error: {e}")
+                self._dead_letter(batch, str(e))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, batch):
+        for attempt in range(1, NOTIFY_MAX_ATTEMPTS + 1):
+            try:
+                response = self._session.post(
+                    self.batch_url,
+                    json={'notifications': batch},
+                    timeout=NOTIFY_TIMEOUT
+                )
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code < 500:
+                    self._handle_response(batch, response)
+                    return
+                error = f"HTTP {response.status_code}"
+
+            if attempt < NOTIFY_MAX_ATTEMPTS:
+                delay = min(0.5 * (2 ** attempt), 30)
+                logger.warning(f"Notification batch failed ({error}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+        self._dead_letter(batch, error)
+
+    def _handle_response(self, batch, response):
+        if response.status_code >= 400:
+            self._dead_letter(batch, f"HTTP {response.status_code}: {response.text[:200]}")
+            return
+
+        results = response.json().get('results', [])
+        rejected = [
+            (item, result.get('error'))
+            for item, result in zip(batch, results)
+            if result.get('status') == 'error'
+        ]
+        for item, error in rejected:
+            self._dead_letter([item], error)
+
+        logger.info(f"🔔 Sent {len(batch) - len(rejected)} notifications in one batch")
+
+    def _dead_letter(self, notifications, error):
+        dead_letter(self.redis_client, notifications, error)
+
+    def close(self, timeout=NOTIFY_TIMEOUT * 2):
+        """Give the sender a chance to drain the queue on shutdown"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline and self._thread and self._thread.is_alive():
+            time.sleep(0.05)
+
+
+class KafkaNotificationPublisher:
+    """Same enqueue() / close() as NotificationDispatcher, over Kafka"""
+
+    def __init__(self, bootstrap_servers, redis_client, topic=NOTIFICATIONS_TOPIC):
+        self.bootstrap_servers = bootstrap_servers
+        self.topic = topic
+        self.redis_client = redis_client
+        self._producer = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _get_producer(self):
+        # נוצר בשימוש הראשון - processor.py מחכה ל-Kafka רק אחרי ה-import
+        if self._producer is None:
+            with self._lock:
+                if self._producer is None:
+                    self._producer = KafkaProducer(
+                        bootstrap_servers=self.bootstrap_servers,
+                        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+                        key_serializer=lambda k: k.encode('utf-8') if k else None,
+                        acks='all',
+                        retries=NOTIFY_MAX_ATTEMPTS,
+                        linger_ms=int(NOTIFY_LINGER * 1000),
+                        compression_type='gzip',
+                        # buffer מלא -> dead-letter אחרי שנייה, לא חוסמים את ה-settlement
+                        max_block_ms=1000
+                    )
+        return self._producer
+
+    def enqueue(self, notification):
+        """Non-blocking - called on the settlement path"""
+        try:
+            future = self._get_producer().send(self.topic, key=notification.get('user_email'), value=notification)
+        except KafkaError as e:
+            dead_letter(self.redis_client, [notification], str(e))
+            return
+        future.add_errback(lambda e: dead_letter(self.redis_client, [notification], str(e)))
+
+    def close(self, timeout=NOTIFY_TIMEOUT * 2):
+        if self._producer is None:
+            return
+        try:
+            self._producer.flush(timeout=timeout)
+        except KafkaError as e:
+            logger.error(f"Failed to flush notifications on shutdown: {e}")
+
+
+def dead_letter(redis_client, notifications, error):
+    logger.error(f"☠️ Dead-lettering {len(notifications)} notifications: {error}")
+    try:
+        redis_client.rpush(
+            NOTIFY_DEAD_LETTER_KEY,
+            *[
+                json.dumps({'notification': n, 'error': error, 'failed_at': datetime.now().isoformat()})
+                for n in notifications
+            ]
+        )
+    except Exception as e:
+        logger.error(f"Failed to write dead-letter notifications: {e} | {notifications}")
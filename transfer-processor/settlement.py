@@ -0,0 +1,190 @@
+"""
+📦 Micro-batched settlement for transfer-processor
+==================================================
+Settles every approved transfer of one Kafka poll in a single DB
+transaction, with a fixed number of statements regardless of batch size:
+
+1. claim      UPDATE transfer_requests ... WHERE id = ANY(:ids) AND state = 'approved'
+2. lock       SELECT ... FROM accounts WHERE id = ANY(:ids) ORDER BY id FOR UPDATE
+3. fail       UPDATE transfer_requests SET state = 'failed' WHERE id = ANY(:ids)
+4. balances   UPDATE accounts ... FROM (VALUES (id, delta), ...)
+5. ledger     INSERT INTO transactions VALUES (...), (...), ...
+6. link       UPDATE transfer_requests ... FROM (VALUES (id, transaction_id), ...)
+7. emails     SELECT id, email FROM users WHERE id = ANY(:ids)
+
+Funding is decided in Python against the locked balances, in created_at
+order, so one transfer short on funds fails alone while the rest commit.
+If anything else goes wrong the caller falls back to `execute_transfer`
+one transfer at a time.
+"""
+
+import uuid
+from collections import namedtuple
+
+from sqlalchemy import text
+
+SettlementResult = namedtuple(
+    'SettlementResult',
+    ['transfer_request_id', 'status', 'transaction_id', 'amount',
+     'initiator_email', 'from_account_number', 'to_account_number',
+     'from_account_id', 'to_account_id']
+)
+
+
+def values_clause(rows, casts, prefix):
+    """(VALUES (CAST(:p0_0 AS uuid), ...), ...) + bind params for a multi-row statement"""
+    params = {}
+    tuples = []
+    for i, row in enumerate(rows):
+        placeholders = []
+        for j, (value, cast) in enumerate(zip(row, casts)):
+            name = f'{prefix}{i}_{j}'
+            params[name] = value
+            placeholders.append(f'CAST(:{name} AS {cast})')
+        tuples.append(f"({', '.join(placeholders)})")
+    return f"(VALUES {', '.join(tuples)})", params
+
+
+def settle_batch(connection, transfer_request_ids, now):
+    """
+    Settle approved transfers inside the caller's transaction.
+    Returns a SettlementResult per claimed transfer (already-processed ids are skipped).
+    """
+    ids = list(dict.fromkeys(transfer_request_ids))
+
+    # 1. Claim - אותו מעבר state מותנה כמו ב-execute_transfer
+    transfers = connection.execute(
+        text("""
+            UPDATE transfer_requests
+            SET state = 'completed', updated_at = :now
+            WHERE id = ANY(CAST(:ids AS uuid[])) AND state = 'approved'
+            RETURNING id, initiator_id, from_account_id, to_account_id, amount, created_at
+        """),
+        {'ids': ids, 'now': now}
+    ).fetchall()
+
+    if not transfers:
+        return []
+
+    transfers = sorted(transfers, key=lambda t: (t.created_at, str(t.id)))
+
+    # 2. נעילת כל החשבונות המעורבים לפי סדר id
+    account_ids = sorted({str(t.from_account_id) for t in transfers} | {str(t.to_account_id) for t in transfers})
+    accounts = {
+        str(row.id): row
+        for row in connection.execute(
+            text("""
+                SELECT id, account_number, balance_cents FROM accounts
+                WHERE id = ANY(CAST(:ids AS uuid[]))
+                ORDER BY id
+                FOR UPDATE
+            """),
+            {'ids': account_ids}
+        )
+    }
+
+    balances = {account_id: row.balance_cents for account_id, row in accounts.items()}
+    deltas = {}
+    completed = []
+    failed = []
+
+    for t in transfers:
+        from_id, to_id = str(t.from_account_id), str(t.to_account_id)
+        if to_id not in balances:
+            raise ValueError(f"Destination account {to_id} not found")
+
+        if balances[from_id] < t.amount:
+            failed.append(t)
+            continue
+
+        balances[from_id] -= t.amount
+        balances[to_id] += t.amount
+        deltas[from_id] = deltas.get(from_id, 0) - t.amount
+        deltas[to_id] = deltas.get(to_id, 0) + t.amount
+        completed.append((t, str(uuid.uuid4())))
+
+    # 3. העברות בלי כיסוי - failed בפקודה אחת
+    if failed:
+        connection.execute(
+            text("""
+                UPDATE transfer_requests
+                SET state = 'failed', decline_reason = 'Insufficient funds', updated_at = :now
+                WHERE id = ANY(CAST(:ids AS uuid[]))
+            """),
+            {'ids': [str(t.id) for t in failed], 'now': now}
+        )
+
+    if completed:
+        # 4. יתרות - delta נטו לכל חשבון
+        changed = [(account_id, delta) for account_id, delta in sorted(deltas.items()) if delta]
+        if changed:
+            values, params = values_clause(changed, ('uuid', 'bigint'), 'd')
+            connection.execute(
+                text(f"""
+                    UPDATE accounts AS a
+                    SET balance_cents = a.balance_cents + v.delta, updated_at = :now
+                    FROM {values} AS v(id, delta)
+                    WHERE a.id = v.id
+                """),
+                {**params, 'now': now}
+            )
+
+        # 5. רשומות ledger - INSERT אחד מרובה שורות
+        values, params = values_clause(
+            [
+                (transaction_id, str(t.initiator_id), str(t.from_account_id), str(t.to_account_id), t.amount, now, now)
+                for t, transaction_id in completed
+            ],
+            ('uuid', 'uuid', 'uuid', 'uuid', 'bigint', 'timestamp', 'timestamp'),
+            't'
+        )
+        connection.execute(
+            text(f"""
+                INSERT INTO transactions
+                (id, initiator_id, from_bank_account_id, to_bank_account_id, amount, created_at, updated_at)
+                SELECT * FROM {values} AS v
+            """),
+            params
+        )
+
+        # 6. קישור transaction_id ל-transfer_requests
+        values, params = values_clause(
+            [(str(t.id), transaction_id) for t, transaction_id in completed],
+            ('uuid', 'uuid'),
+            'l'
+        )
+        connection.execute(
+            text(f"""
+                UPDATE transfer_requests AS tr
+                SET transaction_id = v.transaction_id
+                FROM {values} AS v(id, transaction_id)
+                WHERE tr.id = v.id
+            """),
+            params
+        )
+
+    # 7. מיילים להתראות
+    emails = {
+        str(row.id): row.email
+        for row in connection.execute(
+            text("SELECT id, email FROM users WHERE id = ANY(CAST(:ids AS uuid[]))"),
+            {'ids': list({str(t.initiator_id) for t, _ in completed})}
+        )
+    } if completed else {}
+
+    results = [
+        SettlementResult(
+            str(t.id), 'completed', transaction_id, t.amount,
+            emails.get(str(t.initiator_id)),
+            accounts[str(t.from_account_id)].account_number,
+            accounts[str(t.to_account_id)].account_number,
+            str(t.from_account_id), str(t.to_account_id)
+        )
+        for t, transaction_id in completed
+    ]
+    results += [
+        SettlementResult(str(t.id), 'insufficient_funds', None, t.amount, None, None, None,
+                         str(t.from_account_id), str(t.to_account_id))
+        for t in failed
+    ]
+    return results
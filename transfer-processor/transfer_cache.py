@@ -0,0 +1,217 @@
+"""
+🗂️ Redis cache of transfer state
+================================
+Copy this file to each service that reads or changes transfer state:
+- transaction-service/transfer_cache.py
+- transfer-processor/transfer_cache.py
+
+The only code that writes `transfer:<id>`. Every write goes through one Lua
+script, so each one is atomic and:
+
+- never moves a transfer back: pending < approved < completed | failed | declined.
+  A write that arrives out of order (a retried Kafka message, a replica that
+  lost a race, a DB read that raced the processor) only fills in fields the
+  hash does not have yet
+- once final, a state only changes to another final state when the write comes
+  from the DB (read-repair) - the DB is the source of truth
+- refreshes the TTL (TRANSFER_CACHE_TTL) - a hash created by a late write
+  never stays forever
+- publishes the change on `transfer-events:<id>` (see transfer_events.py)
+  when the state was applied
+
+Read-repair: a miss, or a hash without `initiator_id` (the ownership check
+needs it), is loaded from Postgres and written back through the same script.
+
+Warmup after a Redis flush / failover, from either service directory:
+
+    python transfer_cache.py warmup --hours 24
+"""
+
+import argparse
+import json
+import logging
+import os
+
+from prometheus_client import Counter
+
+from transfer_events import TRANSFER_EVENTS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+TRANSFER_CACHE_TTL = int(os.environ.get('TRANSFER_CACHE_TTL', 86400))
+
+TRANSFER_KEY = 'transfer:{}'
+TERMINAL_STATES = {'completed', 'failed', 'declined'}
+FIELDS = ('state', 'amount', 'initiator_id', 'from_account_id', 'to_account_id', 'requires_approval', 'transaction_id')
+
+# KEYS[1] = hash, ARGV = ttl, channel, event ('' = no publish), authoritative ('1' / '0'), state, field, value, ...
+WRITE_SCRIPT = """
+local RANK = {pending = 0, approved = 1, completed = 2, failed = 2, declined = 2}
+local key, ttl, channel, event = KEYS[1], ARGV[1], ARGV[2], ARGV[3]
+local authoritative, new_state = ARGV[4] == '1', ARGV[5]
+
+local current = redis.call('HGET', key, 'state')
+local stale = false
+if current then
+    local current_rank, new_rank = RANK[current] or 0, RANK[new_state] or 0
+    stale = current_rank > new_rank
+        or (not authoritative and current_rank == 2 and current ~= new_state)
+end
+
+for i = 6, #ARGV, 2 do
+    if stale then
+        redis.call('HSETNX', key, ARGV[i], ARGV[i + 1])
+    else
+        redis.call('HSET', key, ARGV[i], ARGV[i + 1])
+    end
+end
+redis.call('EXPIRE', key, ttl)
+
+if stale then
+    return 0
+end
+if event ~= '' then
+    redis.call('PUBLISH', channel, event)
+end
+return 1
+"""
+
+# ==========================================
+# Metrics Definitions
+# ==========================================
+
+transfer_cache_writes_total = Counter(
+    'transfer_cache_writes_total',
+    'Writes to the transfer state cache',
+    ['origin', 'result']   # origin: transition | repair, result: applied | stale
+)
+
+
+class TransferCache:
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self._write = redis_client.register_script(WRITE_SCRIPT)
+
+    def set_state(self, transfer_request_id, fields, pipeline=None):
+        """
+        A state transition - write-through + publish. With `pipeline` the
+        script call is only queued and the caller executes it (batch settlement).
+        """
+        transfer_request_id = str(transfer_request_id)
+        event = json.dumps({'transfer_request_id': transfer_request_id, **fields})
+        applied = self._call(transfer_request_id, fields, event, authoritative=False, pipeline=pipeline)
+        if pipeline is None:
+            transfer_cache_writes_total.labels(origin='transition', result='applied' if applied else 'stale').inc()
+            if not applied:
+                logger.info(f"Transfer {transfer_request_id}: cache kept a newer state than {fields.get('state')}")
+        return applied
+
+    def repair(self, transfers):
+        """Write DB rows back (read-repair / warmup) - no publish, never regresses state"""
+        if not transfers:
+            return
+        pipeline = self.redis.pipeline(transaction=False)
+        for transfer in transfers:
+            self._call(str(transfer.id), fields_from_row(transfer), '', authoritative=True, pipeline=pipeline)
+        for applied in pipeline.execute():
+            transfer_cache_writes_total.labels(origin='repair', result='applied' if applied else 'stale').inc()
+
+    def _call(self, transfer_request_id, fields, event, authoritative, pipeline=None):
+        args = [
+            TRANSFER_CACHE_TTL,
+            TRANSFER_EVENTS_CHANNEL.format(transfer_request_id),
+            event,
+            '1' if authoritative else '0',
+            fields['state']
+        ]
+        for field, value in fields.items():
+            args.extend((field, value))
+        return self._write(keys=[TRANSFER_KEY.format(transfer_request_id)], args=args, client=pipeline or self.redis)
+
+    def get_many(self, transfer_request_ids):
+        """[hash or None] in the same order - one pipeline. A hash without initiator_id counts as a miss"""
+        pipeline = self.redis.pipeline(transaction=False)
+        for transfer_request_id in transfer_request_ids:
+            pipeline.hgetall(TRANSFER_KEY.format(transfer_request_id))
+        return [data if data.get('initiator_id') else None for data in pipeline.execute()]
+
+    def get(self, transfer_request_id):
+        return self.get_many([transfer_request_id])[0]
+
+
+def fields_from_row(transfer):
+    fields = {
+        'state': transfer.state,
+        'amount': transfer.amount,
+        'initiator_id': str(transfer.initiator_id),
+        'from_account_id': str(transfer.from_account_id),
+        'to_account_id': str(transfer.to_account_id),
+        'requires_approval': str(transfer.requires_approval)
+    }
+    if transfer.transaction_id:
+        fields['transaction_id'] = str(transfer.transaction_id)
+    return fields
+
+
+# ==========================================
+# Warmup
+# ==========================================
+
+WARMUP_QUERY = """
+    SELECT * FROM transfer_requests
+    WHERE (created_at, id) > (:after_created_at, :after_id)
+      AND (created_at >= now() - make_interval(hours => :hours) OR state IN ('pending', 'approved'))
+    ORDER BY created_at, id
+    LIMIT :batch_size
+"""
+
+
+def warmup(transfer_cache, hours, batch_size):
+    """Load recent and in-flight transfers into Redis, keyset-paginated"""
+    from datetime import datetime
+    from sqlalchemy import text
+    from db import get_read_connection
+
+    after = (datetime.min, '00000000-0000-0000-0000-000000000000')
+    total = 0
+    while True:
+        with get_read_connection() as connection:
+            transfers = connection.execute(text(WARMUP_QUERY), {
+                'after_created_at': after[0], 'after_id': after[1],
+                'hours': hours, 'batch_size': batch_size
+            }).fetchall()
+        if not transfers:
+            break
+        transfer_cache.repair(transfers)
+        total += len(transfers)
+        after = (transfers[-1].created_at, str(transfers[-1].id))
+        logger.info(f"🔥 Warmed {total} transfers")
+    return total
+
+
+def main():
+    import redis
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Transfer state cache tools')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    warmup_parser = subcommands.add_parser('warmup', help='load recent and in-flight transfers into Redis')
+    warmup_parser.add_argument('--hours', type=int, default=24, help='also load final transfers created in the last N hours')
+    warmup_parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    redis_client = redis.Redis(
+        host=os.environ.get('REDIS_HOST', 'localhost'),
+        port=int(os.environ.get('REDIS_PORT', 6379)),
+        decode_responses=True
+    )
+    if args.command == 'warmup':
+        total = warmup(TransferCache(redis_client), args.hours, args.batch_size)
+        logger.info(f"✅ Warmup done: {total} transfers")
+
+
+if __name__ == '__main__':
+    main()
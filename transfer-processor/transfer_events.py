@@ -0,0 +1,151 @@
+"""
+📡 Transfer state changes over Redis pub/sub
+============================================
+Copy this file to each service that changes transfer state:
+- transaction-service/transfer_events.py
+- transfer-processor/transfer_events.py
+
+Every state change goes through TransferCache.set_state() (transfer_cache.py):
+the `transfer:<id>` hash is updated and `transfer-events:<id>` is published
+in the same Lua script, so a subscriber never hears about a state the hash
+does not have yet.
+
+transaction-service holds long-poll / SSE requests on a TransferEventListener
+instead of having clients poll GET /transfers/<id>/status:
+
+- one PSUBSCRIBE connection per worker process, started on first use (after
+  the gunicorn fork) - not one subscription per waiting request
+- a waiter registers *before* it reads the current state, so a change that
+  lands in between is not lost
+- at most TRANSFER_MAX_WAITERS waiters per process. Every waiter holds a
+  request thread - keep it below GUNICORN_THREADS so plain requests still
+  get served. Over the limit the endpoint answers 503 and the client falls
+  back to polling
+- if the subscription drops, all waiters are woken up to re-read the state:
+  events published while disconnected are gone, the hash is not
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+TRANSFER_MAX_WAITERS = int(os.environ.get('TRANSFER_MAX_WAITERS', 24))
+
+TRANSFER_EVENTS_CHANNEL = 'transfer-events:{}'
+
+# מה שה-waiter מקבל כשה-subscription נפל - "תקרא את ה-state מחדש"
+RESYNC = {'resync': True}
+
+
+class TooManyWaiters(Exception):
+    """TRANSFER_MAX_WAITERS requests are already waiting in this process"""
+
+
+class Waiter:
+
+    def __init__(self, listener, transfer_request_id):
+        self.listener = listener
+        self.transfer_request_id = transfer_request_id
+        self.events = queue.Queue()
+        self._closed = False
+
+    def get(self, timeout):
+        """Next event (dict) for this transfer, or None on timeout"""
+        try:
+            return self.events.get(timeout=max(timeout, 0))
+        except queue.Empty:
+            return None
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.listener._unregister(self)
+
+
+class TransferEventListener:
+
+    def __init__(self, redis_client, max_waiters=TRANSFER_MAX_WAITERS):
+        self.redis = redis_client
+        self.max_waiters = max_waiters
+        self._slots = threading.BoundedSemaphore(max_waiters)
+        self._waiters = {}   # transfer_request_id -> set of Waiter
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._subscribed = threading.Event()
+
+    def open(self, transfer_request_id):
+        """Register a waiter - close() it when done. Raises TooManyWaiters"""
+        if not self._slots.acquire(blocking=False):
+            raise TooManyWaiters(f"{self.max_waiters} transfer waiters already open")
+        try:
+            self._ensure_started()
+        except Exception:
+            # לא נפתח waiter - מחזירים את ה-slot, אחרת כמה תקלות Redis ינעלו את כולם
+            self._slots.release()
+            raise
+        waiter = Waiter(self, transfer_request_id)
+        with self._lock:
+            self._waiters.setdefault(transfer_request_id, set()).add(waiter)
+        return waiter
+
+    def _unregister(self, waiter):
+        with self._lock:
+            waiters = self._waiters.get(waiter.transfer_request_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[waiter.transfer_request_id]
+        self._slots.release()
+
+    def _ensure_started(self):
+        # thread לא שורד fork - כל worker של gunicorn מפעיל listener משלו
+        if self._thread is None or self._pid != os.getpid():
+            with self._lock:
+                if self._thread is None or self._pid != os.getpid():
+                    self._subscribed = threading.Event()
+                    self._pid = os.getpid()
+                    self._thread = threading.Thread(target=self._run, name='transfer-events', daemon=True)
+                    self._thread.start()
+        # עד שה-PSUBSCRIBE אושר, אירוע עלול ללכת לאיבוד - ה-waiter יקרא את ה-hash בכל מקרה
+        self._subscribed.wait(timeout=2)
+
+    def _run(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                pubsub.psubscribe(TRANSFER_EVENTS_CHANNEL.format('*'))
+                for message in pubsub.listen():
+                    if message['type'] == 'psubscribe':
+                        self._subscribed.set()
+                    elif message['type'] == 'pmessage':
+                        self._dispatch(message['data'])
+            except redis.RedisError as e:
+                logger.warning(f"Transfer events subscription lost, reconnecting: {e}")
+                self._subscribed.clear()
+                self._wake_all()
+                time.sleep(1)
+
+    def _dispatch(self, data):
+        try:
+            event = json.loads(data)
+        except ValueError:
+            return
+        with self._lock:
+            waiters = list(self._waiters.get(event.get('transfer_request_id'), ()))
+        for waiter in waiters:
+            waiter.events.put(event)
+
+    def _wake_all(self):
+        with self._lock:
+            waiters = [w for ws in self._waiters.values() for w in ws]
+        for waiter in waiters:
+            waiter.events.put(RESYNC)
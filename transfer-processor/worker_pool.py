@@ -0,0 +1,211 @@
+"""
+⚙️ Partition-aware worker pool for transfer-processor
+=====================================================
+Records are routed to one of N "lanes" by their Kafka key (the source
+account id). Each lane is a single worker thread, so:
+
+- transfers that touch the same source account run in order
+- transfers of unrelated accounts run concurrently across lanes
+
+Threads (not processes) are enough here - the work is DB/Redis round trips,
+which release the GIL.
+
+Offsets are committed per partition only up to the lowest offset that is
+still in flight, so a crash never skips a record that was not finished.
+A record whose handler raises RetryLater (a transient error - the DB is down)
+stays in flight: its lane keeps retrying it, in order, until it succeeds or
+the partition is revoked / the consumer shuts down, and only then is it
+handed to the next owner uncommitted.
+"""
+
+import logging
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from kafka import ConsumerRebalanceListener
+from kafka.structs import OffsetAndMetadata
+
+logger = logging.getLogger(__name__)
+
+
+class RetryLater(Exception):
+    """Transient failure - the record must not be committed; it is retried / redelivered instead"""
+
+
+class OffsetTracker:
+    """Tracks in-flight offsets per partition and computes safe commit points"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}     # tp -> set of offsets being processed
+        self._next_offset = {}   # tp -> highest finished offset + 1
+        self._committed = {}     # tp -> last committed offset
+        self._revoking = set()   # partitions being handed to another replica
+
+    def started(self, tp, offset):
+        with self._lock:
+            self._in_flight.setdefault(tp, set()).add(offset)
+
+    def finished(self, tp, offset):
+        with self._lock:
+            self._in_flight.get(tp, set()).discard(offset)
+            self._next_offset[tp] = max(self._next_offset.get(tp, 0), offset + 1)
+
+    def revoke(self, partitions):
+        with self._lock:
+            self._revoking.update(partitions)
+
+    def revoking(self, tp):
+        with self._lock:
+            return tp in self._revoking
+
+    def in_flight(self):
+        with self._lock:
+            return sum(len(offsets) for offsets in self._in_flight.values())
+
+    def committable(self):
+        """{tp: OffsetAndMetadata} - the lowest in-flight offset, or next after the last finished"""
+        with self._lock:
+            offsets = {}
+            for tp, next_offset in self._next_offset.items():
+                pending = self._in_flight.get(tp)
+                offset = min(pending) if pending else next_offset
+                if self._committed.get(tp) != offset:
+                    offsets[tp] = OffsetAndMetadata(offset, '')
+            return offsets
+
+    def committed(self, offsets):
+        with self._lock:
+            for tp, offset_and_metadata in offsets.items():
+                self._committed[tp] = offset_and_metadata.offset
+
+    def forget(self, partitions):
+        with self._lock:
+            for tp in partitions:
+                self._in_flight.pop(tp, None)
+                self._next_offset.pop(tp, None)
+                self._committed.pop(tp, None)
+                self._revoking.discard(tp)
+
+
+class KeyedWorkerPool:
+    """N single-threaded lanes; the same key always lands on the same lane"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._lanes = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'transfer-lane-{i}')
+            for i in range(workers)
+        ]
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args):
+        lane = self._lanes[zlib.crc32(key.encode('utf-8')) % self.workers]
+        future = lane.submit(fn, *args)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def drain(self):
+        """Wait for everything submitted so far (used on rebalance / shutdown)"""
+        with self._lock:
+            pending = list(self._futures)
+        for future in pending:
+            future.exception()
+
+    def shutdown(self):
+        for lane in self._lanes:
+            lane.shutdown(wait=True)
+
+
+class DrainOnRevoke(ConsumerRebalanceListener):
+    """Before partitions move to another replica - finish their work and commit"""
+
+    def __init__(self, consumer, pool, tracker):
+        self.consumer = consumer
+        self.pool = pool
+        self.tracker = tracker
+
+    def on_partitions_revoked(self, revoked):
+        # lane שממתין ל-DB מפסיק לנסות - הרשומה שלו לא מקומטת ותגיע ל-replica הבא
+        self.tracker.revoke(revoked)
+        self.pool.drain()
+        commit_offsets(self.consumer, self.tracker)
+        self.tracker.forget(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        logger.info(f"📌 Assigned partitions: {sorted((tp.topic, tp.partition) for tp in assigned)}")
+
+
+def commit_offsets(consumer, tracker):
+    offsets = tracker.committable()
+    if offsets:
+        try:
+            consumer.commit(offsets)
+            tracker.committed(offsets)
+        except Exception as e:
+            # הקומיט הבא יכסה את זה - במקרה הגרוע הודעות יעובדו שוב
+            logger.warning(f"Offset commit failed: {e}")
+
+
+def record_key(message):
+    """Source account (the producer's key) with fallbacks for old events"""
+    if message.key:
+        return message.key.decode('utf-8')
+    value = message.value or {}
+    return str(value.get('from_account_id') or value.get('transfer_request_id') or '')
+
+
+def run_pool(consumer, topics, handle_message, workers, max_in_flight, poll_timeout_ms, max_records,
+             retry_budget):
+    """Consume `topics` with a keyed worker pool and manual, gap-safe commits"""
+    pool = KeyedWorkerPool(workers)
+    tracker = OffsetTracker()
+    stopping = threading.Event()
+    consumer.subscribe(topics, listener=DrainOnRevoke(consumer, pool, tracker))
+
+    def process(tp, message):
+        while not (stopping.is_set() or tracker.revoking(tp)):
+            try:
+                handle_message(tp.topic, message, time.time() + retry_budget)
+            except RetryLater:
+                # תקלה זמנית - נשארים על הרשומה הזו (הסדר ב-lane נשמר), ה-offset לא מקומט
+                continue
+            except Exception:
+                logger.exception(f"Unhandled error processing {tp.topic}@{tp.partition}:{message.offset}")
+            tracker.finished(tp, message.offset)
+            return
+
+    paused = False
+    try:
+        while True:
+            messages = consumer.poll(timeout_ms=poll_timeout_ms, max_records=max_records)
+
+            for tp, records in messages.items():
+                for message in records:
+                    tracker.started(tp, message.offset)
+                    pool.submit(record_key(message), process, tp, message)
+
+            commit_offsets(consumer, tracker)
+
+            # Backpressure: ממשיכים לעשות poll (heartbeat) אבל בלי לקבל רשומות חדשות
+            in_flight = tracker.in_flight()
+            if not paused and in_flight >= max_in_flight:
+                consumer.pause(*consumer.assignment())
+                paused = True
+            elif paused and in_flight < max_in_flight // 2:
+                consumer.resume(*consumer.paused())
+                paused = False
+    finally:
+        stopping.set()
+        pool.drain()
+        commit_offsets(consumer, tracker)
+        pool.shutdown()
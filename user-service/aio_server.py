@@ -0,0 +1,330 @@
+"""
+⚡ grpc.aio entry point for user-service
+========================================
+USER_SERVICE_SERVER=aio python main.py
+
+The sync server caps concurrency at GRPC_MAX_WORKERS threads, however cheap
+the RPCs are. Here every RPC is a coroutine on one event loop:
+
+- DB access goes through SQLAlchemy's async engine on asyncpg, with its own
+  connection pool (same DB_POOL_* settings as db.py)
+- only bcrypt leaves the loop - PasswordHasher.*_async run it on the same
+  process pool as the sync server
+- GRPC_MAX_CONCURRENT_STREAMS / GRPC_MAX_CONCURRENT_RPCS bound the load,
+  keepalive settings drop dead client connections
+- SIGTERM/SIGINT stop accepting new RPCs and give in-flight ones
+  GRPC_SHUTDOWN_GRACE seconds to finish
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import uuid
+from datetime import datetime
+
+import grpc
+from prometheus_client import start_http_server
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import user_service_pb2
+import user_service_pb2_grpc
+from password_hasher import HasherBusy
+from user_batch import UserBatch, EXISTING_EMAILS_QUERY, CREATE_USERS_MAX_BATCH
+from user_listing import (
+    build_list_users_query, build_stream_users_query, split_page, encode_page_token,
+    user_count, InvalidPageToken, COUNT_QUERY, COUNT_PARAMS
+)
+from token_verifier import LOAD_REVOKED_QUERY, INSERT_REVOKED_QUERY, TOKEN_REVOKED_RELOAD_SECONDS
+from db import DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+from server import (
+    GRPC_PORT, METRICS_PORT, VERIFY_TOKENS_MAX_BATCH,
+    password_hasher, token_verifier, create_access_token, user_to_proto,
+    verify_token_response
+)
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+GRPC_MAX_CONCURRENT_STREAMS = int(os.environ.get('GRPC_MAX_CONCURRENT_STREAMS', 1000))
+GRPC_MAX_CONCURRENT_RPCS = int(os.environ.get('GRPC_MAX_CONCURRENT_RPCS', 0)) or None
+GRPC_KEEPALIVE_TIME_MS = int(os.environ.get('GRPC_KEEPALIVE_TIME_MS', 30000))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.environ.get('GRPC_KEEPALIVE_TIMEOUT_MS', 10000))
+GRPC_SHUTDOWN_GRACE = float(os.environ.get('GRPC_SHUTDOWN_GRACE', 10))
+
+# postgresql://... -> postgresql+asyncpg://...
+ASYNC_DATABASE_URL = DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://', 1)
+
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
+)
+
+
+async def rehash_password(user, password):
+    """BCRYPT_ROUNDS changed - upgrade the stored hash while we have the plaintext"""
+    try:
+        new_hash = await password_hasher.hash_async(password)
+        async with engine.begin() as connection:
+            await connection.execute(
+                text("UPDATE users SET password = :new, updated_at = :now WHERE id = :id AND password = :old"),
+                {'new': new_hash, 'now': datetime.now(), 'id': user.id, 'old': user.password}
+            )
+    except Exception as e:
+        logger.warning(f"Password rehash failed for user {user.id}: {e}")
+
+
+# rehash אחד בכל פעם, מחוץ ל-Login - עסוק? מדלגים, ההתחברות הבאה תנסה שוב
+rehash_task = None
+
+
+def schedule_rehash(user, password):
+    """Upgrade the hash in a background task - Login returns after one bcrypt, not two"""
+    global rehash_task
+    if rehash_task is not None and not rehash_task.done():
+        return
+    rehash_task = asyncio.create_task(rehash_password(user, password))
+
+
+class AsyncUserService(user_service_pb2_grpc.UserServiceServicer):
+    """Same contract as server.UserService, on the event loop"""
+
+    async def CreateUser(self, request, context):
+        try:
+            hashed_password = await password_hasher.hash_async(request.password)
+
+            async with engine.begin() as connection:
+                existing_user = (await connection.execute(
+                    text("SELECT id FROM users WHERE email = :email"),
+                    {'email': request.email}
+                )).fetchone()
+
+                if existing_user:
+                    context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+                    context.set_details('Email already exists')
+                    return user_service_pb2.CreateUserResponse()
+
+                user_id = str(uuid.uuid4())
+                await connection.execute(
+                    text(
+                        "INSERT INTO users (id, first_name, last_name, email, password, created_at, updated_at) "
+                        "VALUES (:user_id, :first_name, :last_name, :email, :password, :created_at, :updated_at)"
+                    ),
+                    {
+                        'user_id': user_id,
+                        'first_name': request.first_name,
+                        'last_name': request.last_name,
+                        'email': request.email,
+                        'password': hashed_password,
+                        'created_at': datetime.now(),
+                        'updated_at': datetime.now()
+                    }
+                )
+
+            return user_service_pb2.CreateUserResponse(id=user_id, message="User created successfully")
+
+        except HasherBusy as e:
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(str(e))
+            return user_service_pb2.CreateUserResponse()
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return user_service_pb2.CreateUserResponse()
+
+    async def CreateUsers(self, request, context):
+        if len(request.users) > CREATE_USERS_MAX_BATCH:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f'Batch too large (max {CREATE_USERS_MAX_BATCH} users)'
+            )
+
+        try:
+            batch = UserBatch(request.users)
+
+            if batch.pending:
+                async with engine.connect() as connection:
+                    existing = (await connection.execute(EXISTING_EMAILS_QUERY, {'emails': batch.emails})).scalars().all()
+                batch.mark_existing(existing)
+
+            if batch.pending:
+                hashed_passwords = await password_hasher.hash_many_async(batch.passwords)
+                query, params = batch.insert_query(hashed_passwords, datetime.now())
+                async with engine.begin() as connection:
+                    batch.mark_inserted((await connection.execute(query, params)).fetchall())
+
+            return batch.response()
+
+        except HasherBusy as e:
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(str(e))
+            return user_service_pb2.CreateUsersResponse()
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return user_service_pb2.CreateUsersResponse()
+
+    async def ListUsers(self, request, context):
+        try:
+            query, params, page_size = build_list_users_query(request)
+
+            async with engine.connect() as connection:
+                total = user_count.fresh()
+                if total is None:
+                    total = user_count.store((await connection.execute(COUNT_QUERY, COUNT_PARAMS)).scalar())
+
+                users = (await connection.execute(query, params)).fetchall()
+
+            users, next_page_token = split_page(users, page_size)
+            return user_service_pb2.ListUsersResponse(
+                users=[user_to_proto(user) for user in users],
+                total=total,
+                next_page_token=next_page_token
+            )
+
+        except InvalidPageToken as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return user_service_pb2.ListUsersResponse()
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return user_service_pb2.ListUsersResponse()
+
+    async def StreamUsers(self, request, context):
+        try:
+            query, params, chunk_size = build_stream_users_query(request)
+        except InvalidPageToken as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        async with engine.connect() as connection:
+            result = await connection.stream(query, params)
+            async for users in result.partitions(chunk_size):
+                # yield ממתין עד שיש מקום ב-window של ה-stream
+                yield user_service_pb2.UsersChunk(
+                    users=[user_to_proto(user) for user in users],
+                    resume_token=encode_page_token(users[-1])
+                )
+
+    async def Login(self, request, context):
+        try:
+            async with engine.connect() as connection:
+                user = (await connection.execute(
+                    text("SELECT * FROM users WHERE email = :email"),
+                    {'email': request.email}
+                )).fetchone()
+
+            if not user or not await password_hasher.check_async(request.password, user.password):
+                context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+                context.set_details('Invalid credentials')
+                return user_service_pb2.LoginResponse()
+
+            if password_hasher.needs_rehash(user.password):
+                schedule_rehash(user, request.password)
+
+            return user_service_pb2.LoginResponse(
+                access_token=create_access_token(user),
+                user_id=str(user.id),
+                message="Login successful"
+            )
+
+        except HasherBusy as e:
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(str(e))
+            return user_service_pb2.LoginResponse()
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return user_service_pb2.LoginResponse()
+
+    async def VerifyToken(self, request, context):
+        return verify_token_response(request.token)
+
+    async def VerifyTokens(self, request, context):
+        if len(request.tokens) > VERIFY_TOKENS_MAX_BATCH:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f'Batch too large (max {VERIFY_TOKENS_MAX_BATCH} tokens)'
+            )
+        return user_service_pb2.VerifyTokensResponse(
+            results=[verify_token_response(token) for token in request.tokens]
+        )
+
+    async def RevokeToken(self, request, context):
+        claims, error = token_verifier.verify(request.token)
+        if error == 'revoked':
+            return user_service_pb2.RevokeTokenResponse(revoked=True)
+        if claims is None:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, f'Token {error}')
+        if not claims.get('jti'):
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, 'Token has no jti and cannot be revoked')
+
+        async with engine.begin() as connection:
+            await connection.execute(INSERT_REVOKED_QUERY, {'jti': claims['jti'], 'expires_at': int(claims['exp'])})
+        token_verifier.revoke(claims['jti'], claims['exp'])
+        return user_service_pb2.RevokeTokenResponse(revoked=True)
+
+
+async def load_revoked_tokens():
+    """Merge revoked_tokens into the verifier - also picks up revocations made by other replicas"""
+    try:
+        async with engine.connect() as connection:
+            token_verifier.load_revoked((await connection.execute(LOAD_REVOKED_QUERY)).fetchall())
+    except ProgrammingError as e:
+        logger.error(f"❌ Cannot load revoked tokens (has migration 0004 run?): {e}")
+    except Exception as e:
+        logger.warning(f"Loading revoked tokens failed, will retry: {e}")
+
+
+async def reload_revoked_tokens():
+    while True:
+        await asyncio.sleep(TOKEN_REVOKED_RELOAD_SECONDS)
+        await load_revoked_tokens()
+
+
+async def serve():
+    server = grpc.aio.server(
+        maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS,
+        options=[
+            ('grpc.max_concurrent_streams', GRPC_MAX_CONCURRENT_STREAMS),
+            ('grpc.keepalive_time_ms', GRPC_KEEPALIVE_TIME_MS),
+            ('grpc.keepalive_timeout_ms', GRPC_KEEPALIVE_TIMEOUT_MS),
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.http2.min_ping_interval_without_data_ms', GRPC_KEEPALIVE_TIME_MS // 2),
+        ]
+    )
+    await load_revoked_tokens()
+    reload_task = asyncio.create_task(reload_revoked_tokens())
+
+    user_service_pb2_grpc.add_UserServiceServicer_to_server(AsyncUserService(), server)
+    server.add_insecure_port(f'[::]:{GRPC_PORT}')
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await server.start()
+    print(f"User Service (gRPC aio) starting on port {GRPC_PORT}...")
+
+    await stop.wait()
+    print(f"Shutting down - waiting up to {GRPC_SHUTDOWN_GRACE}s for in-flight RPCs...")
+    await server.stop(GRPC_SHUTDOWN_GRACE)
+    reload_task.cancel()
+    await engine.dispose()
+    password_hasher.shutdown()
+
+
+def main():
+    start_http_server(METRICS_PORT)
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
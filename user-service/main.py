@@ -0,0 +1,23 @@
+"""
+🚪 Entry point for user-service
+===============================
+    python main.py
+
+USER_SERVICE_SERVER picks the server: sync (ThreadPoolExecutor, server.py) or
+aio (grpc.aio + asyncpg, aio_server.py). Neither module runs as __main__, so
+aio_server's `from server import ...` shares one PasswordHasher pool,
+TokenVerifier and engine instead of loading server.py a second time.
+"""
+
+import os
+
+# sync (ThreadPoolExecutor) או aio (grpc.aio + asyncpg, ראה aio_server.py)
+USER_SERVICE_SERVER = os.environ.get('USER_SERVICE_SERVER', 'sync')
+
+if __name__ == '__main__':
+    if USER_SERVICE_SERVER == 'aio':
+        import aio_server
+        aio_server.main()
+    else:
+        import server
+        server.serve()
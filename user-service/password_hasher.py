@@ -0,0 +1,199 @@
+"""
+🔑 Password hashing off the gRPC threads
+=========================================
+bcrypt is slow on purpose. Run inline on the gRPC worker threads, a login
+storm occupies every worker and cheap RPCs (ListUsers) queue behind it.
+
+PasswordHasher runs hashpw/checkpw on a dedicated executor:
+- BCRYPT_EXECUTOR=process (default) - a ProcessPoolExecutor of BCRYPT_WORKERS
+- BCRYPT_EXECUTOR=thread            - threads; bcrypt releases the GIL while hashing
+
+At most BCRYPT_MAX_PENDING hashes may be running or queued, and each one
+holds a gRPC thread while it waits. Keep it below GRPC_MAX_WORKERS so some
+threads are always free for non-crypto RPCs. A caller that cannot get a slot
+within BCRYPT_QUEUE_TIMEOUT (default 0 - fail fast, since waiting would also
+hold a gRPC thread) gets HasherBusy -> RESOURCE_EXHAUSTED.
+
+The aio server uses hash_async/check_async instead. Waiting there costs no
+thread, so callers queue on an asyncio semaphore for up to
+BCRYPT_ASYNC_QUEUE_TIMEOUT before being rejected.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+from prometheus_client import Counter, Gauge, Histogram
+
+# Configuration
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+BCRYPT_EXECUTOR = os.environ.get('BCRYPT_EXECUTOR', 'process')
+BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', os.cpu_count() or 2))
+BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', 6))
+BCRYPT_QUEUE_TIMEOUT = float(os.environ.get('BCRYPT_QUEUE_TIMEOUT', 0))
+BCRYPT_ASYNC_QUEUE_TIMEOUT = float(os.environ.get('BCRYPT_ASYNC_QUEUE_TIMEOUT', 5))
+
+# ==========================================
+# Metrics Definitions
+# ==========================================
+
+bcrypt_queue_depth = Gauge(
+    'bcrypt_queue_depth',
+    'Password hashes running or waiting for a bcrypt worker'
+)
+
+bcrypt_duration_seconds = Histogram(
+    'bcrypt_duration_seconds',
+    'Time from submit to result, including queueing',
+    ['operation'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+)
+
+bcrypt_rejected_total = Counter(
+    'bcrypt_rejected_total',
+    'Hash requests rejected because the bcrypt pool was saturated',
+    ['operation']
+)
+
+
+class HasherBusy(Exception):
+    """No bcrypt slot became free within BCRYPT_QUEUE_TIMEOUT"""
+
+
+# פונקציות ברמת המודול - חייבות להיות picklable בשביל ה-process pool
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def _call_chunk(fn, calls):
+    """One round trip to a worker process for a whole chunk of calls"""
+    return [fn(*args) for args in calls]
+
+
+def hash_rounds(hashed):
+    """Cost factor of an existing hash: $2b$12$... -> 12"""
+    try:
+        return int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, executor=BCRYPT_EXECUTOR,
+                 workers=BCRYPT_WORKERS, max_pending=BCRYPT_MAX_PENDING):
+        self.rounds = rounds
+        self._executor_kind = executor
+        self._workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._async_slots = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self._executor_kind == 'thread':
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self._workers, thread_name_prefix='bcrypt'
+                        )
+                    else:
+                        # spawn ולא fork - לא משכפלים את ה-threads של gRPC לתוך ה-workers
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self._workers,
+                            mp_context=multiprocessing.get_context('spawn')
+                        )
+        return self._executor
+
+    def _chunks(self, calls):
+        size = -(-len(calls) // self._workers)
+        return [calls[i:i + size] for i in range(0, len(calls), size)]
+
+    def _run(self, operation, fn, calls):
+        """Run fn(*args) for every args tuple in `calls` under one slot - a batch spreads over all workers"""
+        acquired = (
+            self._slots.acquire(timeout=BCRYPT_QUEUE_TIMEOUT) if BCRYPT_QUEUE_TIMEOUT > 0
+            else self._slots.acquire(blocking=False)
+        )
+        if not acquired:
+            bcrypt_rejected_total.labels(operation=operation).inc()
+            raise HasherBusy('Password hashing is saturated, try again later')
+
+        bcrypt_queue_depth.inc(len(calls))
+        started = time.time()
+        try:
+            executor = self._get_executor()
+            futures = [executor.submit(_call_chunk, fn, chunk) for chunk in self._chunks(calls)]
+            return [result for future in futures for result in future.result()]
+        finally:
+            bcrypt_duration_seconds.labels(operation=operation).observe(time.time() - started)
+            bcrypt_queue_depth.dec(len(calls))
+            self._slots.release()
+
+    async def _run_async(self, operation, fn, calls):
+        if self._async_slots is None:
+            # נוצר בתוך ה-event loop של ה-aio server
+            self._async_slots = asyncio.Semaphore(self._max_pending)
+
+        bcrypt_queue_depth.inc(len(calls))
+        started = time.time()
+        try:
+            try:
+                await asyncio.wait_for(self._async_slots.acquire(), BCRYPT_ASYNC_QUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                bcrypt_rejected_total.labels(operation=operation).inc()
+                raise HasherBusy('Password hashing is saturated, try again later')
+            try:
+                executor = self._get_executor()
+                chunks = await asyncio.gather(*[
+                    asyncio.wrap_future(executor.submit(_call_chunk, fn, chunk)) for chunk in self._chunks(calls)
+                ])
+                return [result for chunk in chunks for result in chunk]
+            finally:
+                self._async_slots.release()
+        finally:
+            bcrypt_duration_seconds.labels(operation=operation).observe(time.time() - started)
+            bcrypt_queue_depth.dec(len(calls))
+
+    def hash(self, password):
+        """str -> bcrypt hash (str) at the configured cost"""
+        return self.hash_many([password])[0]
+
+    def hash_many(self, passwords):
+        """Batch hashing (CreateUsers) - takes one slot, runs in parallel on all workers"""
+        if not passwords:
+            return []
+        calls = [(password.encode('utf-8'), self.rounds) for password in passwords]
+        return [hashed.decode('utf-8') for hashed in self._run('hash', _hash, calls)]
+
+    def check(self, password, hashed):
+        return self._run('check', _check, [(password.encode('utf-8'), hashed.encode('utf-8'))])[0]
+
+    async def hash_async(self, password):
+        return (await self.hash_many_async([password]))[0]
+
+    async def hash_many_async(self, passwords):
+        if not passwords:
+            return []
+        calls = [(password.encode('utf-8'), self.rounds) for password in passwords]
+        return [hashed.decode('utf-8') for hashed in await self._run_async('hash', _hash, calls)]
+
+    async def check_async(self, password, hashed):
+        return (await self._run_async('check', _check, [(password.encode('utf-8'), hashed.encode('utf-8'))]))[0]
+
+    def needs_rehash(self, hashed):
+        return hash_rounds(hashed) != self.rounds
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
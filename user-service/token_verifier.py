@@ -0,0 +1,94 @@
+"""
+🎫 Token introspection for VerifyToken / VerifyTokens / RevokeToken
+===================================================================
+- verified claims are cached in a bounded LRU keyed by the token's SHA-256,
+  for at most TOKEN_CACHE_TTL seconds and never past the token's `exp`
+- revoked token ids (the `jti` claim) are kept in memory until their
+  token would have expired anyway. Every lookup checks the set, cached
+  or not, so a revocation takes effect immediately on the replica that
+  handled RevokeToken
+- revocations are persisted in `revoked_tokens` (migration 0004), loaded on
+  startup and re-loaded every TOKEN_REVOKED_RELOAD_SECONDS - other
+  user-service replicas see a revocation within that interval
+
+Tokens issued before `jti` was added verify normally but cannot be revoked;
+they expire within 24 hours.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from sqlalchemy import text
+
+# Configuration
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 100000))
+TOKEN_CACHE_TTL = float(os.environ.get('TOKEN_CACHE_TTL', 300))
+TOKEN_REVOKED_RELOAD_SECONDS = float(os.environ.get('TOKEN_REVOKED_RELOAD_SECONDS', 10))
+
+LOAD_REVOKED_QUERY = text("SELECT jti, expires_at FROM revoked_tokens WHERE expires_at > extract(epoch FROM now())")
+INSERT_REVOKED_QUERY = text("""
+    INSERT INTO revoked_tokens (jti, expires_at)
+    VALUES (CAST(:jti AS uuid), :expires_at)
+    ON CONFLICT (jti) DO NOTHING
+""")
+
+
+class TokenVerifier:
+
+    def __init__(self, secret_key, cache_size=TOKEN_CACHE_SIZE, cache_ttl=TOKEN_CACHE_TTL):
+        self.secret_key = secret_key
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()   # token hash -> (claims, cached_until)
+        self._revoked = {}            # jti -> exp
+        self._lock = threading.Lock()
+
+    def verify(self, token):
+        """(claims, None) for a valid token, else (None, 'expired' | 'revoked' | 'invalid')"""
+        key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[1] > now:
+                self._cache.move_to_end(key)
+                claims = entry[0]
+            else:
+                claims = None
+
+        if claims is None:
+            try:
+                claims = jwt.decode(token, self.secret_key, algorithms=['HS256'])
+            except jwt.ExpiredSignatureError:
+                return None, 'expired'
+            except jwt.InvalidTokenError:
+                return None, 'invalid'
+            if 'user_id' not in claims:
+                return None, 'invalid'
+
+            with self._lock:
+                self._cache[key] = (claims, min(claims.get('exp', float('inf')), now + self.cache_ttl))
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if claims.get('jti') in self._revoked:
+            return None, 'revoked'
+        return claims, None
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            self._revoked[jti] = expires_at
+            # ניקוי - טוקן שפג תוקפו נכשל ממילא על exp
+            now = time.time()
+            for expired in [j for j, exp in self._revoked.items() if exp <= now]:
+                del self._revoked[expired]
+
+    def load_revoked(self, rows):
+        with self._lock:
+            for row in rows:
+                self._revoked[str(row.jti)] = row.expires_at
@@ -0,0 +1,102 @@
+"""
+👥 CreateUsers batch planning, shared by the sync and aio servers
+=================================================================
+Per batch, whatever its size:
+1. one   SELECT email FROM users WHERE email = ANY(:emails)  - known emails skip bcrypt
+2. one   parallel hash of the remaining passwords (PasswordHasher.hash_many)
+3. one   INSERT ... VALUES (...), (...) ON CONFLICT (email) DO NOTHING RETURNING id, email
+         - a row that lost a race with a concurrent insert just comes back as already_exists
+"""
+
+import os
+import uuid
+
+from sqlalchemy import text
+
+import user_service_pb2
+
+# Configuration
+CREATE_USERS_MAX_BATCH = int(os.environ.get('CREATE_USERS_MAX_BATCH', 1000))
+
+EXISTING_EMAILS_QUERY = text("SELECT email FROM users WHERE email = ANY(CAST(:emails AS text[]))")
+
+
+class UserBatch:
+    """Tracks one result per request item, in request order"""
+
+    def __init__(self, requests):
+        self.requests = list(requests)
+        self.results = [user_service_pb2.CreateUserResult(email=r.email) for r in self.requests]
+        self.pending = []   # indexes still to insert
+
+        seen = set()
+        for i, r in enumerate(self.requests):
+            if not r.email or not r.password:
+                self._fail(i, 'error', error='email and password are required')
+            elif r.email in seen:
+                self._fail(i, 'already_exists', error='Duplicate email in batch')
+            else:
+                seen.add(r.email)
+                self.pending.append(i)
+
+    def _fail(self, i, status, error=''):
+        self.results[i].status = status
+        self.results[i].error = error
+
+    @property
+    def emails(self):
+        return [self.requests[i].email for i in self.pending]
+
+    @property
+    def passwords(self):
+        return [self.requests[i].password for i in self.pending]
+
+    def mark_existing(self, existing_emails):
+        existing_emails = set(existing_emails)
+        remaining = []
+        for i in self.pending:
+            if self.requests[i].email in existing_emails:
+                self._fail(i, 'already_exists', error='Email already exists')
+            else:
+                remaining.append(i)
+        self.pending = remaining
+
+    def insert_query(self, hashed_passwords, now):
+        """Multi-row INSERT for the pending items -> (query, params)"""
+        params = {'now': now}
+        rows = []
+        for n, (i, hashed) in enumerate(zip(self.pending, hashed_passwords)):
+            r = self.requests[i]
+            params.update({
+                f'id{n}': str(uuid.uuid4()),
+                f'first_name{n}': r.first_name,
+                f'last_name{n}': r.last_name,
+                f'email{n}': r.email,
+                f'password{n}': hashed
+            })
+            rows.append(f"(CAST(:id{n} AS uuid), :first_name{n}, :last_name{n}, :email{n}, :password{n}, :now, :now)")
+
+        query = text(f"""
+            INSERT INTO users (id, first_name, last_name, email, password, created_at, updated_at)
+            VALUES {', '.join(rows)}
+            ON CONFLICT (email) DO NOTHING
+            RETURNING id, email
+        """)
+        return query, params
+
+    def mark_inserted(self, inserted_rows):
+        ids = {row.email: str(row.id) for row in inserted_rows}
+        for i in self.pending:
+            user_id = ids.get(self.requests[i].email)
+            if user_id:
+                self.results[i].status = 'created'
+                self.results[i].id = user_id
+            else:
+                self._fail(i, 'already_exists', error='Email already exists')
+        self.pending = []
+
+    def response(self):
+        return user_service_pb2.CreateUsersResponse(
+            results=self.results,
+            created=sum(1 for r in self.results if r.status == 'created')
+        )
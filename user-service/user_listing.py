@@ -0,0 +1,135 @@
+"""
+📇 ListUsers paging, shared by the sync and aio servers
+=======================================================
+- page_token: keyset on (created_at, id) - every page is an index range scan
+  (users_created_at_id_index), however deep. `page` + OFFSET still works
+  for old clients, and also returns a next_page_token so they can switch.
+- total: never a COUNT(*) per call. It comes from a process-wide cache that is at
+  most USER_COUNT_TTL seconds old. Below USER_COUNT_EXACT_BELOW rows the refresh is
+  an exact COUNT(*); above that it reads the planner's estimate (pg_class.reltuples),
+  which autovacuum/ANALYZE keep current.
+- StreamUsers: same ordering, no LIMIT - rows come off a server-side cursor
+  chunk by chunk, so memory stays flat whatever the table size.
+"""
+
+import base64
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+
+# Configuration
+LIST_USERS_DEFAULT_PAGE_SIZE = int(os.environ.get('LIST_USERS_DEFAULT_PAGE_SIZE', 10))
+LIST_USERS_MAX_PAGE_SIZE = int(os.environ.get('LIST_USERS_MAX_PAGE_SIZE', 500))
+STREAM_USERS_CHUNK_SIZE = int(os.environ.get('STREAM_USERS_CHUNK_SIZE', 500))
+STREAM_USERS_MAX_CHUNK_SIZE = int(os.environ.get('STREAM_USERS_MAX_CHUNK_SIZE', 5000))
+USER_COUNT_TTL = float(os.environ.get('USER_COUNT_TTL', 30))
+USER_COUNT_EXACT_BELOW = int(os.environ.get('USER_COUNT_EXACT_BELOW', 100000))
+
+USER_COLUMNS = "id, first_name, last_name, email, created_at"
+
+COUNT_QUERY = text("""
+    SELECT CASE WHEN c.reltuples < :exact_below
+                THEN (SELECT COUNT(*) FROM users)
+                ELSE c.reltuples::bigint END
+    FROM pg_class c
+    WHERE c.oid = 'users'::regclass
+""")
+COUNT_PARAMS = {'exact_below': USER_COUNT_EXACT_BELOW}
+
+
+class InvalidPageToken(ValueError):
+    pass
+
+
+def encode_page_token(user):
+    raw = f"{user.created_at.isoformat()}|{user.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_page_token(token):
+    try:
+        created_at, user_id = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), str(uuid.UUID(user_id))
+    except Exception:
+        raise InvalidPageToken('Invalid page_token')
+
+
+def build_list_users_query(request):
+    """ListUsersRequest -> (query, params, page_size). Fetches one extra row to detect the last page"""
+    page_size = request.page_size if request.page_size > 0 else LIST_USERS_DEFAULT_PAGE_SIZE
+    page_size = min(page_size, LIST_USERS_MAX_PAGE_SIZE)
+    params = {'limit': page_size + 1}
+
+    if request.page_token:
+        params['after_created_at'], params['after_id'] = decode_page_token(request.page_token)
+        query = text(f"""
+            SELECT {USER_COLUMNS} FROM users
+            WHERE (created_at, id) > (:after_created_at, CAST(:after_id AS uuid))
+            ORDER BY created_at, id
+            LIMIT :limit
+        """)
+    else:
+        page = request.page if request.page > 0 else 1
+        params['offset'] = (page - 1) * page_size
+        query = text(f"""
+            SELECT {USER_COLUMNS} FROM users
+            ORDER BY created_at, id
+            LIMIT :limit OFFSET :offset
+        """)
+
+    return query, params, page_size
+
+
+def build_stream_users_query(request):
+    """StreamUsersRequest -> (query, params, chunk_size) - no LIMIT, read through a server-side cursor"""
+    chunk_size = request.chunk_size if request.chunk_size > 0 else STREAM_USERS_CHUNK_SIZE
+    chunk_size = min(chunk_size, STREAM_USERS_MAX_CHUNK_SIZE)
+
+    if request.after_token:
+        after_created_at, after_id = decode_page_token(request.after_token)
+        query = text(f"""
+            SELECT {USER_COLUMNS} FROM users
+            WHERE (created_at, id) > (:after_created_at, CAST(:after_id AS uuid))
+            ORDER BY created_at, id
+        """)
+        return query, {'after_created_at': after_created_at, 'after_id': after_id}, chunk_size
+
+    return text(f"SELECT {USER_COLUMNS} FROM users ORDER BY created_at, id"), {}, chunk_size
+
+
+def split_page(users, page_size):
+    """(rows of this page, next_page_token or '')"""
+    if len(users) > page_size:
+        users = users[:page_size]
+        return users, encode_page_token(users[-1])
+    return users, ''
+
+
+class CachedCount:
+    """Last known value + when it was read; shared by all threads / coroutines"""
+
+    def __init__(self, ttl=USER_COUNT_TTL):
+        self.ttl = ttl
+        self._value = None
+        self._fetched_at = 0
+        self._lock = threading.Lock()
+
+    def fresh(self):
+        """The cached value if younger than ttl, else None"""
+        with self._lock:
+            if self._value is not None and time.time() - self._fetched_at < self.ttl:
+                return self._value
+            return None
+
+    def store(self, value):
+        with self._lock:
+            self._value = int(value or 0)
+            self._fetched_at = time.time()
+            return self._value
+
+
+user_count = CachedCount()
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12user_service.proto\x12\x04user\"[\n\x11\x43reateUserRequest\x12\x12\n\nfirst_name\x18\x01 \x01(\t\x12\x11\n\tlast_name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x10\n\x08password\x18\x04 \x01(\t\"1\n\x12\x43reateUserResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"3\n\x10ListUsersRequest\x12\x0c\n\x04page\x18\x01 \x01(\x05\x12\x11\n\tpage_size\x18\x02 \x01(\x05\"\\\n\x04User\x12\n\n\x02id\x18\x01 \x01(\t\x12\x12\n\nfirst_name\x18\x02 \x01(\t\x12\x11\n\tlast_name\x18\x03 \x01(\t\x12\r\n\x05\x65mail\x18\x04 \x01(\t\x12\x12\n\ncreated_at\x18\x05 \x01(\t\"=\n\x11ListUsersResponse\x12\x19\n\x05users\x18\x01 \x03(\x0b\x32\n.user.User\x12\r\n\x05total\x18\x02 \x01(\x05\"/\n\x0cLoginRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"G\n\rLoginResponse\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t2\xbe\x01\n\x0bUserService\x12?\n\nCreateUser\x12\x17.user.CreateUserRequest\x1a\x18.user.CreateUserResponse\x12<\n\tListUsers\x12\x16.user.ListUsersRequest\x1a\x17.user.ListUsersResponse\x12\x30\n\x05Login\x12\x12.user.LoginRequest\x1a\x13.user.LoginResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12user_service.proto\x12\x04user\"[\n\x11\x43reateUserRequest\x12\x12\n\nfirst_name\x18\x01 \x01(\t\x12\x11\n\tlast_name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x10\n\x08password\x18\x04 \x01(\t\"1\n\x12\x43reateUserResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"<\n\x12\x43reateUsersRequest\x12&\n\x05users\x18\x01 \x03(\x0b\x32\x17.user.CreateUserRequest\"L\n\x10\x43reateUserResult\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\n\n\x02id\x18\x03 \x01(\t\x12\r\n\x05\x65rror\x18\x04 \x01(\t\"O\n\x13\x43reateUsersResponse\x12\'\n\x07results\x18\x01 \x03(\x0b\x32\x16.user.CreateUserResult\x12\x0f\n\x07\x63reated\x18\x02 \x01(\x05\"G\n\x10ListUsersRequest\x12\x0c\n\x04page\x18\x01 \x01(\x05\x12\x11\n\tpage_size\x18\x02 \x01(\x05\x12\x12\n\npage_token\x18\x03 \x01(\t\"\\\n\x04User\x12\n\n\x02id\x18\x01 \x01(\t\x12\x12\n\nfirst_name\x18\x02 \x01(\t\x12\x11\n\tlast_name\x18\x03 \x01(\t\x12\r\n\x05\x65mail\x18\x04 \x01(\t\x12\x12\n\ncreated_at\x18\x05 \x01(\t\"V\n\x11ListUsersResponse\x12\x19\n\x05users\x18\x01 \x03(\x0b\x32\n.user.User\x12\r\n\x05total\x18\x02 \x01(\x05\x12\x17\n\x0fnext_page_token\x18\x03 \x01(\t\"/\n\x0cLoginRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"G\n\rLoginResponse\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"=\n\x12StreamUsersRequest\x12\x13\n\x0b\x61\x66ter_token\x18\x01 \x01(\t\x12\x12\n\nchunk_size\x18\x02 \x01(\x05\"=\n\nUsersChunk\x12\x19\n\x05users\x18\x01 \x03(\x0b\x32\n.user.User\x12\x14\n\x0cresume_token\x18\x02 \x01(\t\"#\n\x12VerifyTokenRequest\x12\r\n\x05token\x18\x01 \x01(\t\"g\n\x13VerifyTokenResponse\x12\r\n\x05valid\x18\x01 \x01(\x08\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x12\n\nexpires_at\x18\x04 \x01(\x03\x12\r\n\x05\x65rror\x18\x05 \x01(\t\"%\n\x13VerifyTokensRequest\x12\x0e\n\x06tokens\x18\x01 \x03(\t\"B\n\x14VerifyTokensResponse\x12*\n\x07results\x18\x01 \x03(\x0b\x32\x19.user.VerifyTokenResponse\"#\n\x12RevokeTokenRequest\x12\r\n\x05token\x18\x01 \x01(\t\"&\n\x13RevokeTokenResponse\x12\x0f\n\x07revoked\x18\x01 \x01(\x08\x32\x8e\x04\n\x0bUserService\x12?\n\nCreateUser\x12\x17.user.CreateUserRequest\x1a\x18.user.CreateUserResponse\x12\x42\n\x0b\x43reateUsers\x12\x18.user.CreateUsersRequest\x1a\x19.user.CreateUsersResponse\x12<\n\tListUsers\x12\x16.user.ListUsersRequest\x1a\x17.user.ListUsersResponse\x12\x30\n\x05Login\x12\x12.user.LoginRequest\x1a\x13.user.LoginResponse\x12;\n\x0bStreamUsers\x12\x18.user.StreamUsersRequest\x1a\x10.user.UsersChunk0\x01\x12\x42\n\x0bVerifyToken\x12\x18.user.VerifyTokenRequest\x1a\x19.user.VerifyTokenResponse\x12\x45\n\x0cVerifyTokens\x12\x19.user.VerifyTokensRequest\x1a\x1a.user.VerifyTokensResponse\x12\x42\n\x0bRevokeToken\x12\x18.user.RevokeTokenRequest\x1a\x19.user.RevokeTokenResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -35,16 +35,38 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_CREATEUSERREQUEST']._serialized_end=119
   _globals['_CREATEUSERRESPONSE']._serialized_start=121
   _globals['_CREATEUSERRESPONSE']._serialized_end=170
-  _globals['_LISTUSERSREQUEST']._serialized_start=172
-  _globals['_LISTUSERSREQUEST']._serialized_end=223
-  _globals['_USER']._serialized_start=225
-  _globals['_USER']._serialized_end=317
-  _globals['_LISTUSERSRESPONSE']._serialized_start=319
-  _globals['_LISTUSERSRESPONSE']._serialized_end=380
-  _globals['_LOGINREQUEST']._serialized_start=382
-  _globals['_LOGINREQUEST']._serialized_end=429
-  _globals['_LOGINRESPONSE']._serialized_start=431
-  _globals['_LOGINRESPONSE']._serialized_end=502
-  _globals['_USERSERVICE']._serialized_start=505
-  _globals['_USERSERVICE']._serialized_end=695
+  _globals['_CREATEUSERSREQUEST']._serialized_start=172
+  _globals['_CREATEUSERSREQUEST']._serialized_end=232
+  _globals['_CREATEUSERRESULT']._serialized_start=234
+  _globals['_CREATEUSERRESULT']._serialized_end=310
+  _globals['_CREATEUSERSRESPONSE']._serialized_start=312
+  _globals['_CREATEUSERSRESPONSE']._serialized_end=391
+  _globals['_LISTUSERSREQUEST']._serialized_start=393
+  _globals['_LISTUSERSREQUEST']._serialized_end=464
+  _globals['_USER']._serialized_start=466
+  _globals['_USER']._serialized_end=558
+  _globals['_LISTUSERSRESPONSE']._serialized_start=560
+  _globals['_LISTUSERSRESPONSE']._serialized_end=646
+  _globals['_LOGINREQUEST']._serialized_start=648
+  _globals['_LOGINREQUEST']._serialized_end=695
+  _globals['_LOGINRESPONSE']._serialized_start=697
+  _globals['_LOGINRESPONSE']._serialized_end=768
+  _globals['_STREAMUSERSREQUEST']._serialized_start=770
+  _globals['_STREAMUSERSREQUEST']._serialized_end=831
+  _globals['_USERSCHUNK']._serialized_start=833
+  _globals['_USERSCHUNK']._serialized_end=894
+  _globals['_VERIFYTOKENREQUEST']._serialized_start=896
+  _globals['_VERIFYTOKENREQUEST']._serialized_end=931
+  _globals['_VERIFYTOKENRESPONSE']._serialized_start=933
+  _globals['_VERIFYTOKENRESPONSE']._serialized_end=1036
+  _globals['_VERIFYTOKENSREQUEST']._serialized_start=1038
+  _globals['_VERIFYTOKENSREQUEST']._serialized_end=1075
+  _globals['_VERIFYTOKENSRESPONSE']._serialized_start=1077
+  _globals['_VERIFYTOKENSRESPONSE']._serialized_end=1143
+  _globals['_REVOKETOKENREQUEST']._serialized_start=1145
+  _globals['_REVOKETOKENREQUEST']._serialized_end=1180
+  _globals['_REVOKETOKENRESPONSE']._serialized_start=1182
+  _globals['_REVOKETOKENRESPONSE']._serialized_end=1220
+  _globals['_USERSERVICE']._serialized_start=1223
+  _globals['_USERSERVICE']._serialized_end=1749
 # @@protoc_insertion_point(module_scope)
@@ -39,6 +39,11 @@ class UserServiceStub(object):
                 request_serializer=user__service__pb2.CreateUserRequest.SerializeToString,
                 response_deserializer=user__service__pb2.CreateUserResponse.FromString,
                 _registered_method=True)
+        self.CreateUsers = channel.unary_unary(
+                '/user.UserService/CreateUsers',
+                request_serializer=user__service__pb2.CreateUsersRequest.SerializeToString,
+                response_deserializer=user__service__pb2.CreateUsersResponse.FromString,
+                _registered_method=True)
         self.ListUsers = channel.unary_unary(
                 '/user.UserService/ListUsers',
                 request_serializer=user__service__pb2.ListUsersRequest.SerializeToString,
@@ -49,6 +54,26 @@ class UserServiceStub(object):
                 request_serializer=user__service__pb2.LoginRequest.SerializeToString,
                 response_deserializer=user__service__pb2.LoginResponse.FromString,
                 _registered_method=True)
+        self.StreamUsers = channel.unary_stream(
+                '/user.UserService/StreamUsers',
+                request_serializer=user__service__pb2.StreamUsersRequest.SerializeToString,
+                response_deserializer=user__service__pb2.UsersChunk.FromString,
+                _registered_method=True)
+        self.VerifyToken = channel.unary_unary(
+                '/user.UserService/VerifyToken',
+                request_serializer=user__service__pb2.VerifyTokenRequest.SerializeToString,
+                response_deserializer=user__service__pb2.VerifyTokenResponse.FromString,
+                _registered_method=True)
+        self.VerifyTokens = channel.unary_unary(
+                '/user.UserService/VerifyTokens',
+                request_serializer=user__service__pb2.VerifyTokensRequest.SerializeToString,
+                response_deserializer=user__service__pb2.VerifyTokensResponse.FromString,
+                _registered_method=True)
+        self.RevokeToken = channel.unary_unary(
+                '/user.UserService/RevokeToken',
+                request_serializer=user__service__pb2.RevokeTokenRequest.SerializeToString,
+                response_deserializer=user__service__pb2.RevokeTokenResponse.FromString,
+                _registered_method=True)
 
 
 class UserServiceServicer(object):
@@ -60,6 +85,13 @@ class UserServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def CreateUsers(self, request, context):
+        """Bulk onboarding - one dedupe query and one multi-row insert per batch
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ListUsers(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -72,6 +104,33 @@ class UserServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamUsers(self, request, context):
+        """Full user export, ordered by (created_at, id), in chunks over a server-side cursor
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def VerifyToken(self, request, context):
+        """Token introspection for the other services - signature, expiry and revocation
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def VerifyTokens(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RevokeToken(self, request, context):
+        """Logout - the token (by its jti) fails verification from now on
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_UserServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -80,6 +139,11 @@ def add_UserServiceServicer_to_server(servicer, server):
                     request_deserializer=user__service__pb2.CreateUserRequest.FromString,
                     response_serializer=user__service__pb2.CreateUserResponse.SerializeToString,
             ),
+            'CreateUsers': grpc.unary_unary_rpc_method_handler(
+                    servicer.CreateUsers,
+                    request_deserializer=user__service__pb2.CreateUsersRequest.FromString,
+                    response_serializer=user__service__pb2.CreateUsersResponse.SerializeToString,
+            ),
             'ListUsers': grpc.unary_unary_rpc_method_handler(
                     servicer.ListUsers,
                     request_deserializer=user__service__pb2.ListUsersRequest.FromString,
@@ -90,6 +154,26 @@ def add_UserServiceServicer_to_server(servicer, server):
                     request_deserializer=user__service__pb2.LoginRequest.FromString,
                     response_serializer=user__service__pb2.LoginResponse.SerializeToString,
             ),
+            'StreamUsers': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamUsers,
+                    request_deserializer=user__service__pb2.StreamUsersRequest.FromString,
+                    response_serializer=user__service__pb2.UsersChunk.SerializeToString,
+            ),
+            'VerifyToken': grpc.unary_unary_rpc_method_handler(
+                    servicer.VerifyToken,
+                    request_deserializer=user__service__pb2.VerifyTokenRequest.FromString,
+                    response_serializer=user__service__pb2.VerifyTokenResponse.SerializeToString,
+            ),
+            'VerifyTokens': grpc.unary_unary_rpc_method_handler(
+                    servicer.VerifyTokens,
+                    request_deserializer=user__service__pb2.VerifyTokensRequest.FromString,
+                    response_serializer=user__service__pb2.VerifyTokensResponse.SerializeToString,
+            ),
+            'RevokeToken': grpc.unary_unary_rpc_method_handler(
+                    servicer.RevokeToken,
+                    request_deserializer=user__service__pb2.RevokeTokenRequest.FromString,
+                    response_serializer=user__service__pb2.RevokeTokenResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'user.UserService', rpc_method_handlers)
@@ -128,6 +212,33 @@ class UserService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def CreateUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/user.UserService/CreateUsers',
+            user__service__pb2.CreateUsersRequest.SerializeToString,
+            user__service__pb2.CreateUsersResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ListUsers(request,
             target,
@@ -181,3 +292,111 @@ class UserService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/user.UserService/StreamUsers',
+            user__service__pb2.StreamUsersRequest.SerializeToString,
+            user__service__pb2.UsersChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def VerifyToken(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/user.UserService/VerifyToken',
+            user__service__pb2.VerifyTokenRequest.SerializeToString,
+            user__service__pb2.VerifyTokenResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def VerifyTokens(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/user.UserService/VerifyTokens',
+            user__service__pb2.VerifyTokensRequest.SerializeToString,
+            user__service__pb2.VerifyTokensResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RevokeToken(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/user.UserService/RevokeToken',
+            user__service__pb2.RevokeTokenRequest.SerializeToString,
+            user__service__pb2.RevokeTokenResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)